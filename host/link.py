@@ -0,0 +1,95 @@
+"""!@file link.py
+@brief      Simulated serial links between boards, for running on a computer.
+@details    Contains the "Endpoint" class and @c pipe_pair(), which connect
+            two pieces of code the way a pair of UARTs would. Bytes written to
+            one end can be read from the other after a delay made of a fixed
+            latency plus the time to send them at the chosen baud rate, timed
+            by the host @c utime stand-in, so the delay follows its virtual
+            clock when that is in use.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+from collections import deque
+
+import utime
+
+
+class Endpoint:
+    """!@brief      One end of a simulated serial link, with the methods of a UART.
+    """
+
+    def __init__(self, latency, baud):
+        """!@brief          Initializes an end with nothing to read.
+            @param latency  The fixed delay in microseconds before sent bytes
+                            arrive.
+            @param baud     The baud rate; each byte takes ten bit times.
+        """
+        ## The other end of the link.
+        self.peer = None
+        ## The fixed delay in microseconds before sent bytes arrive.
+        self.latency = latency
+        ## The baud rate of the link.
+        self.baud = baud
+        # Bytes on their way to this end, with the times they arrive
+        self._inbox = deque()
+        # The time at which the line will be free to send more bytes
+        self._free = utime.ticks_us()
+
+    def write(self, data):
+        """!@brief          Sends bytes to the other end.
+            @param data     The bytes to send.
+            @return         The number of bytes sent.
+        """
+        now = utime.ticks_us()
+        if utime.ticks_diff(self._free, now) < 0:
+            self._free = now
+        for byte in bytes(data):
+            self._free = utime.ticks_add(self._free, 10000000 // self.baud)
+            self.peer._inbox.append((utime.ticks_add(self._free, self.latency),
+                                     byte))
+        return len(data)
+
+    def any(self):
+        """!@brief      Counts the bytes which have arrived and can be read.
+        """
+        now = utime.ticks_us()
+        count = 0
+        for when, byte in self._inbox:
+            if utime.ticks_diff(now, when) < 0:
+                break
+            count += 1
+        return count
+
+    def readinto(self, buf):
+        """!@brief          Reads bytes which have arrived into a buffer.
+            @param buf      The buffer to fill.
+            @return         The number of bytes read.
+        """
+        count = min(self.any(), len(buf))
+        for idx in range(count):
+            buf[idx] = self._inbox.popleft()[1]
+        return count
+
+    def read(self, size=-1):
+        """!@brief          Reads bytes which have arrived.
+            @param size     The most bytes to read, or -1 for all of them.
+            @return         The bytes read.
+        """
+        count = self.any() if size < 0 else min(size, self.any())
+        return bytes(self._inbox.popleft()[1] for idx in range(count))
+
+
+def pipe_pair(latency=100, baud=115200):
+    """!@brief          Makes the two connected ends of a simulated link.
+        @param latency  The fixed delay in microseconds before bytes arrive.
+        @param baud     The baud rate of the link.
+        @return         A tuple of the two ends.
+    """
+    end_a = Endpoint(latency, baud)
+    end_b = Endpoint(latency, baud)
+    end_a.peer = end_b
+    end_b.peer = end_a
+    return end_a, end_b
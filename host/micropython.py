@@ -0,0 +1,32 @@
+"""!@file micropython.py
+@brief      Host stand-in for MicroPython's @c micropython module.
+@details    The code emitter decorators leave functions unchanged, so code
+            which uses them runs as ordinary Python.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+
+def native(fun):
+    """!@brief      Leaves a function as it is.
+    """
+    return fun
+
+
+def viper(fun):
+    """!@brief      Leaves a function as it is.
+    """
+    return fun
+
+
+def const(value):
+    """!@brief      Returns a constant's value.
+    """
+    return value
+
+
+def alloc_emergency_exception_buf(size):
+    """!@brief      Does nothing, as exceptions in callbacks can always allocate.
+    """
@@ -0,0 +1,255 @@
+"""!@file plant.py
+@brief      Models of the lab's DC motors, and identification from logged runs.
+@details    Contains first- and second-order models of a DC motor driven by
+            @c MotorDriver and measured by an encoder, in the same units as
+            the lab code: duty cycles in percent from -100 to 100 and
+            positions in encoder ticks. The models include duty cycle
+            saturation, Coulomb friction, gear backlash and encoder
+            quantization. @c identify() fits a model to a logged run of
+            times, duty cycles and encoder readings by least squares, and
+            @c simulate() runs a controller such as @c CLController in a loop
+            with a model at a chosen task period.
+
+            Running this file simulates the step responses in the README with
+            the default model: K_p = 0.10, a setpoint of 16,384 ticks, and
+            task periods from 10 ms to 100 ms. The default parameters are not
+            measured; they were picked so the simulated responses follow the
+            trend in the README's plots, settling at short periods and
+            oscillating more and more from about 40 ms on. Use @c identify()
+            on a logged run to get parameters for a real motor.
+
+            @c identify() needs numpy; the models and simulation don't.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import math
+import os
+import sys
+
+# Let the controllers in the lab code be imported
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "src"))
+
+
+class MotorModel:
+    """!@brief      Base class for DC motor models.
+       @details     A model turns a duty cycle into a motor speed, which is
+                    integrated into a motor shaft position. The output shaft
+                    follows the motor shaft through the backlash, and the
+                    encoder reading is the output position rounded down to a
+                    whole tick. Child classes provide @c _accel(), which gives
+                    how fast the speed changes.
+    """
+
+    def __init__(self, K, friction=0.0, backlash=0.0, substep=0.0001):
+        """!@brief              Initializes a motor model at rest.
+            @param K            The steady-state speed in ticks per second for
+                                each percent of duty cycle.
+            @param friction     The duty cycle in percent needed to overcome
+                                Coulomb friction.
+            @param backlash     The total play in ticks between the motor and
+                                the output shaft.
+            @param substep      The time step in seconds used to integrate the
+                                model.
+        """
+        ## Steady-state speed in ticks per second per percent duty cycle.
+        self.K = K
+        ## The duty cycle in percent needed to overcome friction.
+        self.friction = friction
+        ## The play in ticks between the motor and the output shaft.
+        self.backlash = backlash
+        ## The time step in seconds used to integrate the model.
+        self.substep = substep
+        self.reset()
+
+    def reset(self):
+        """!@brief      Puts the model back at rest at position zero.
+        """
+        ## The motor's speed in ticks per second.
+        self.speed = 0.0
+        ## The motor shaft's position in ticks.
+        self.position = 0.0
+        ## The output shaft's position in ticks.
+        self.output = 0.0
+
+    def _drive(self, duty):
+        """!@brief          Finds the duty cycle left after saturation and friction.
+            @param duty     The duty cycle given to the motor driver.
+            @return         The duty cycle which accelerates the motor.
+        """
+        duty = max(-100.0, min(100.0, duty))
+        if self.speed > 0:
+            return duty - self.friction
+        if self.speed < 0:
+            return duty + self.friction
+        # At rest the motor only starts if the drive beats static friction
+        if abs(duty) <= self.friction:
+            return 0.0
+        return duty - math.copysign(self.friction, duty)
+
+    def _accel(self, drive, dt):
+        """!@brief          Advances the model's speed by one substep.
+            @param drive    The duty cycle accelerating the motor.
+            @param dt       The length of the substep in seconds.
+        """
+        raise NotImplementedError
+
+    def step(self, duty, dt):
+        """!@brief          Runs the model with a duty cycle held for a time.
+            @param duty     The duty cycle in percent.
+            @param dt       The time in seconds for which it is held.
+        """
+        steps = max(1, int(round(dt / self.substep)))
+        h = dt / steps
+        half = self.backlash / 2
+        for _ in range(steps):
+            old = self.speed
+            self._accel(self._drive(duty), h)
+            # Friction stops the motor rather than turning it backwards
+            if old * self.speed < 0 and abs(duty) <= self.friction:
+                self.speed = 0.0
+            self.position += self.speed * h
+            if self.position - self.output > half:
+                self.output = self.position - half
+            elif self.output - self.position > half:
+                self.output = self.position + half
+
+    def ticks(self):
+        """!@brief      Reads the encoder.
+            @return     The output shaft's position in whole ticks.
+        """
+        return math.floor(self.output)
+
+
+class FirstOrderMotor(MotorModel):
+    """!@brief      A motor whose speed lags the duty cycle with one time constant.
+       @details     The electrical time constant is taken to be much shorter
+                    than the mechanical one, so the speed obeys
+                    tau * dv/dt = K * u - v.
+    """
+
+    def __init__(self, K=600.0, tau=0.05, **kwargs):
+        """!@brief          Initializes a first-order motor model.
+            @param K        Steady-state speed in ticks per second per percent.
+            @param tau      The mechanical time constant in seconds.
+            @param kwargs   Friction, backlash and substep, as for @c MotorModel.
+        """
+        super().__init__(K, **kwargs)
+        ## The mechanical time constant in seconds.
+        self.tau = tau
+
+    def _accel(self, drive, dt):
+        self.speed += (self.K * drive - self.speed) * dt / self.tau
+
+
+class SecondOrderMotor(MotorModel):
+    """!@brief      A motor with both mechanical and electrical time constants.
+       @details     The torque (in units of duty cycle) lags the duty cycle with
+                    the electrical time constant, and the speed lags the torque
+                    with the mechanical time constant.
+    """
+
+    def __init__(self, K=600.0, tau=0.05, tau_e=0.002, **kwargs):
+        """!@brief          Initializes a second-order motor model.
+            @param K        Steady-state speed in ticks per second per percent.
+            @param tau      The mechanical time constant in seconds.
+            @param tau_e    The electrical time constant in seconds.
+            @param kwargs   Friction, backlash and substep, as for @c MotorModel.
+        """
+        super().__init__(K, **kwargs)
+        ## The mechanical time constant in seconds.
+        self.tau = tau
+        ## The electrical time constant in seconds.
+        self.tau_e = tau_e
+        self.torque = 0.0
+
+    def reset(self):
+        super().reset()
+        ## The motor's torque, in percent of full duty cycle.
+        self.torque = 0.0
+
+    def _accel(self, drive, dt):
+        self.torque += (drive - self.torque) * dt / self.tau_e
+        self.speed += (self.K * self.torque - self.speed) * dt / self.tau
+
+
+def simulate(controller, model, period, duration=5.0):
+    """!@brief              Simulates a control task driving a motor model.
+        @details            Once per period the encoder is read, the controller
+                            is run, and its output is held as the duty cycle
+                            until the next period, as the task in @c main.py
+                            does.
+        @param controller   A controller with a @c run() method, such as a
+                            @c CLController.
+        @param model        The motor model, which is reset first.
+        @param period       The task period in milliseconds.
+        @param duration     The length of the simulation in seconds.
+        @return             A tuple of lists of the times in seconds, encoder
+                            readings in ticks and duty cycles in percent.
+    """
+    model.reset()
+    dt = period / 1000
+    times, ticks, duties = [], [], []
+    for idx in range(int(round(duration / dt))):
+        reading = model.ticks()
+        duty = max(-100.0, min(100.0, controller.run(reading)))
+        times.append(idx * dt)
+        ticks.append(reading)
+        duties.append(duty)
+        model.step(duty, dt)
+    return times, ticks, duties
+
+
+def identify(t, duty, ticks, order=1):
+    """!@brief          Fits a motor model to a logged run by least squares.
+        @details        Speeds are found from the changes in encoder reading
+                        between samples. The discrete model
+                        v[k+1] = a v[k] + b u[k] + c sign(v[k]) (with one more
+                        past speed and duty cycle for a second-order model) is
+                        fitted to all the samples at once, and its coefficients
+                        are turned into the gain, time constants and friction
+                        of a continuous model. The samples should be evenly
+                        spaced in time.
+        @param t        The sample times in seconds.
+        @param duty     The duty cycle in percent applied after each sample.
+        @param ticks    The encoder reading in ticks at each sample.
+        @param order    1 for a @c FirstOrderMotor, 2 for a @c SecondOrderMotor.
+        @return         The fitted model.
+    """
+    import numpy as np
+
+    t = np.asarray(t, dtype=float)
+    u = np.asarray(duty, dtype=float)
+    x = np.asarray(ticks, dtype=float)
+    dt = float(np.mean(np.diff(t)))
+    v = np.diff(x) / np.diff(t)          # Speed over each sample interval
+    u = u[:len(v)]
+
+    if order == 1:
+        X = np.column_stack((v[:-1], u[1:], np.sign(v[:-1])))
+        a, b, c = np.linalg.lstsq(X, v[1:], rcond=None)[0]
+        K = b / (1 - a)
+        return FirstOrderMotor(K, -dt / math.log(a), friction=max(0.0, -c / b))
+
+    X = np.column_stack((v[1:-1], v[:-2], u[2:], u[1:-1], np.sign(v[1:-1])))
+    a1, a2, b1, b2, c = np.linalg.lstsq(X, v[2:], rcond=None)[0]
+    K = (b1 + b2) / (1 - a1 - a2)
+    poles = np.roots([1, -a1, -a2])
+    taus = sorted(-dt / math.log(abs(p)) for p in poles)
+    return SecondOrderMotor(K, taus[1], taus[0],
+                            friction=max(0.0, -c / (b1 + b2)))
+
+
+if __name__ == "__main__":
+    from controller import CLController
+
+    print("PERIOD   OVERSHOOT   FINAL ERROR   SWING IN LAST SECOND")
+    for period in (10, 20, 30, 40, 50, 100):
+        times, ticks, duties = simulate(CLController(.10, 16384),
+                                        SecondOrderMotor(friction=5.0), period)
+        last = ticks[-int(1000 / period):]
+        print("{:4d} ms{:10d}{:14d}{:18d}".format(period, max(ticks) - 16384,
+              16384 - ticks[-1], max(last) - min(last)))
@@ -0,0 +1,155 @@
+"""!@file pyb.py
+@brief      Host stand-in for MicroPython's @c pyb module.
+@details    Provides just enough of the pins, timers and interrupt functions
+            used by the lab code for it to run on a computer. Timers remember
+            every value written to their PWM channels, and the values read
+            from a timer's counter can be fed in ahead of time with
+            @c Timer.feed(), which is how recorded encoder readings are played
+            back by @c replay.py.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+from collections import deque
+
+import utime
+
+
+class ReplayFinished(Exception):
+    """!@brief      Raised when a timer's counter has no more fed values.
+    """
+
+
+class _Board:
+    """!@brief      Names pins by their attribute, as in @c Pin.board.PA10.
+    """
+
+    def __getattr__(self, name):
+        return name
+
+
+class Pin:
+    """!@brief      A pin which remembers whether it was set high or low.
+    """
+    OUT_PP = 1
+    IN = 0
+    ## Pins named after the board's connections.
+    board = _Board()
+
+    def __init__(self, pin, mode=None):
+        ## The name of the pin.
+        self.name = pin
+        ## The pin's level, 0 or 1.
+        self.level = 0
+
+    def high(self):
+        self.level = 1
+
+    def low(self):
+        self.level = 0
+
+    def value(self, level=None):
+        if level is None:
+            return self.level
+        self.level = int(bool(level))
+
+
+class _Channel:
+    """!@brief      A timer channel which remembers the last pulse width set.
+    """
+
+    def __init__(self, timer, number):
+        ## The timer the channel belongs to.
+        self.timer = timer
+        ## The channel's number.
+        self.number = number
+        ## The pulse width last set, in percent or counts.
+        self.width = 0
+
+    def pulse_width_percent(self, percent=None):
+        if percent is None:
+            return self.width
+        self.width = percent
+
+    def pulse_width(self, width=None):
+        if width is None:
+            return self.width
+        self.width = width
+
+
+class Timer:
+    """!@brief      A timer whose counter plays back fed values.
+    """
+    PWM = 0
+    ENC_AB = 1
+    ## The most recently created timer with each number.
+    instances = {}
+    # Counter values waiting to be read, by timer number
+    _feeds = {}
+
+    def __init__(self, number, freq=None, period=0xFFFF, prescaler=0):
+        ## The timer's number.
+        self.number = number
+        ## The channels set up on this timer, by channel number.
+        self.channels = {}
+        self._period = period if freq is None else 4199
+        self._count = 0
+        self._callback = None
+        Timer.instances[number] = self
+
+    @classmethod
+    def feed(cls, number, values):
+        """!@brief          Queues up values to be read from a timer's counter.
+            @param number   The number of the timer.
+            @param values   The values which @c counter() will return in turn.
+        """
+        cls._feeds.setdefault(number, deque()).extend(values)
+
+    @classmethod
+    def reset(cls):
+        """!@brief          Forgets all timers and fed values.
+        """
+        cls.instances = {}
+        cls._feeds = {}
+
+    def channel(self, number, mode=None, pin=None):
+        channel = _Channel(self, number)
+        self.channels[number] = channel
+        return channel
+
+    def counter(self, value=None):
+        """!@brief          Reads the counter, taking the next fed value if any.
+            @details        Raises @c ReplayFinished if values were fed to this
+                            timer and all of them have been read.
+        """
+        if value is not None:
+            self._count = value
+            return
+        feed = Timer._feeds.get(self.number)
+        if feed is not None:
+            if not feed:
+                raise ReplayFinished(self.number)
+            self._count = feed.popleft()
+        return self._count
+
+    def period(self):
+        return self._period
+
+    def callback(self, fun):
+        self._callback = fun
+
+
+def disable_irq():
+    return True
+
+
+def enable_irq(state=True):
+    pass
+
+
+def udelay(us):
+    """!@brief          Waits for a number of microseconds.
+    """
+    utime.sleep_us(us)
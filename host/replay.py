@@ -0,0 +1,200 @@
+"""!@file replay.py
+@brief      Replays a recorded motor control run through the task code.
+@details    Contains the "Replay" class, which runs on the host computer. It
+            reads a log saved by @c recorder.py on a rig, feeds the recorded
+            encoder counter values back into a task from @c main.py through
+            the host stand-in for @c pyb, and checks that the task gives the
+            motor the same duty cycles it did on the rig. The task code is run
+            unchanged by the cotask scheduler on a virtual clock, so a run
+            replays thousands of times faster than real time. A change to the
+            controller or scheduler which makes the outputs differ is reported
+            with the first step at which they differ.
+
+            Example:
+            @code
+            python replay.py run1.rpl --task CLC_fun1 --encoder-timer 8 --motor-timer 3 --period 10
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Use the host stand-ins for the MicroPython modules, and the lab code itself
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(_HERE, "..", "src")]
+
+import pyb
+import utime
+import cotask
+import task_share
+import motor_driver
+import recorder
+
+
+def decode(data):
+    """!@brief          Decodes a recorded log.
+        @param data     The bytes of the log, without the leading magic bytes.
+        @return         A tuple of a list of counter values and a list of duty
+                        cycles in hundredths of a percent, each in the order
+                        in which they were recorded.
+    """
+    values = ([], [])
+    last = [0, 0]
+    token = 0
+    shift = 0
+    for byte in data:
+        token |= (byte & 0x7F) << shift
+        shift += 7
+        if byte & 0x80:
+            continue
+        kind = token & 1
+        zigzag = token >> 1
+        delta = (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1)
+        last[kind] += delta
+        values[kind].append(last[kind])
+        token = 0
+        shift = 0
+    return values
+
+
+def load(path):
+    """!@brief          Reads and decodes a log file saved by a recorder.
+        @param path     The name of the file.
+        @return         A tuple of the counter values and duty cycles, as for
+                        @c decode().
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:len(recorder.MAGIC)] != recorder.MAGIC:
+        raise ValueError(path + " is not a recorder log")
+    return decode(data[len(recorder.MAGIC):])
+
+
+class Replay:
+    """!@brief      Runs a task from @c main.py against recorded encoder readings.
+    """
+
+    def __init__(self, counters, duties, task="CLC_fun1", done="fun1_done",
+                 encoder_timer=8, motor_timer=3, period=10):
+        """!@brief                  Sets up a replay.
+            @param counters         The recorded encoder counter values.
+            @param duties           The recorded duty cycles, in hundredths of
+                                    a percent.
+            @param task             The name of the task function in @c main.py.
+            @param done             The name of the share the task sets when
+                                    it's finished.
+            @param encoder_timer    The number of the encoder's timer.
+            @param motor_timer      The number of the motor's PWM timer.
+            @param period           The task's period in milliseconds.
+        """
+        ## The recorded encoder counter values.
+        self.counters = counters
+        ## The recorded duty cycles, in hundredths of a percent.
+        self.duties = duties
+        ## The duty cycles given by the replayed task.
+        self.outputs = []
+        self._task = task
+        self._done = done
+        self._encoder_timer = encoder_timer
+        self._motor_timer = motor_timer
+        self._period = period
+
+    def run(self, step=1000, timeout=600):
+        """!@brief          Runs the task until the recording has been used up.
+            @param step     The number of virtual microseconds the clock moves
+                            between calls to the scheduler.
+            @param timeout  The longest virtual time, in seconds, to run for.
+            @return         The wall-clock time the replay took, in seconds.
+        """
+        pyb.Timer.reset()
+        pyb.Timer.feed(self._encoder_timer, self.counters)
+        utime.use_virtual_clock()
+
+        # Log every duty cycle given to the recorded motor
+        original = motor_driver.MotorDriver.set_duty_cycle
+        outputs = self.outputs
+        motor_timer = self._motor_timer
+
+        def logged_set_duty_cycle(motor, percent):
+            original(motor, percent)
+            if motor.timer.number == motor_timer:
+                outputs.append(int(motor.duty * 100))
+
+        motor_driver.MotorDriver.set_duty_cycle = logged_set_duty_cycle
+        started = time.perf_counter()
+        try:
+            main = importlib.import_module("main")
+            # The task is given its "done" share, no supervisor, no metrics
+            # and itself, as main.py gives it
+            done = task_share.Share('b', thread_protect=False, name=self._done)
+            shares = [done, None, None, None]
+            task_list = cotask.TaskList()
+            task = cotask.Task(getattr(main, self._task), name=self._task,
+                               priority=1, period=self._period, shares=shares)
+            shares[3] = task
+            task_list.append(task)
+            for tick in range(0, timeout * 1000000, step):
+                utime.advance(step)
+                task_list.pri_sched()
+                if len(outputs) >= len(self.duties):
+                    break
+        except pyb.ReplayFinished:
+            pass
+        finally:
+            motor_driver.MotorDriver.set_duty_cycle = original
+            utime.use_real_clock()
+        return time.perf_counter() - started
+
+    def mismatches(self, tolerance=0):
+        """!@brief              Compares the replayed duty cycles to the recorded ones.
+            @param tolerance    The largest difference, in hundredths of a
+                                percent, which isn't counted as a mismatch.
+            @return             A list of (step, recorded, replayed) tuples for
+                                each step at which the duty cycles differ; if
+                                the replay gave a different number of duty
+                                cycles, a missing one is shown as None.
+        """
+        result = []
+        for idx in range(max(len(self.duties), len(self.outputs))):
+            recorded = self.duties[idx] if idx < len(self.duties) else None
+            replayed = self.outputs[idx] if idx < len(self.outputs) else None
+            if recorded is None or replayed is None \
+                    or abs(recorded - replayed) > tolerance:
+                result.append((idx, recorded, replayed))
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded run.")
+    parser.add_argument("log", help="log file saved by recorder.py")
+    parser.add_argument("--task", default="CLC_fun1",
+                        help="name of the task function in main.py")
+    parser.add_argument("--done", default="fun1_done",
+                        help="name of the task's done share in main.py")
+    parser.add_argument("--encoder-timer", type=int, default=8)
+    parser.add_argument("--motor-timer", type=int, default=3)
+    parser.add_argument("--period", type=float, default=10,
+                        help="task period in milliseconds")
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="allowed difference in hundredths of a percent")
+    args = parser.parse_args()
+
+    counters, duties = load(args.log)
+    replay = Replay(counters, duties, args.task, args.done,
+                    args.encoder_timer, args.motor_timer, args.period)
+    wall = replay.run()
+    bad = replay.mismatches(args.tolerance)
+    print("Replayed {} counter reads and {} duty cycles in {:.3f} s".format(
+        len(counters), len(replay.outputs), wall))
+    if bad:
+        print("{} mismatches; first at step {}: recorded {}, replayed {}"
+              .format(len(bad), *bad[0]))
+        sys.exit(1)
+    print("Outputs match")
@@ -0,0 +1,127 @@
+"""!@file sync_demo.py
+@brief      Runs two simulated boards linked by @c cosync.py.
+@details    Two cotask schedulers, each with its own task list, clock and
+            shares, are linked by a simulated serial link and run on the host
+            @c utime stand-in's virtual clock. The follower's clock is set a
+            long way off from the leader's and runs slightly fast. Once the
+            follower has synced, the leader starts both task lists, and each
+            board runs a 10 ms sampling task. The demo reports how far apart
+            the two boards' samples are and how long a mirrored share takes
+            to reach the other board, and exits with an error if either is
+            more than its limit, so it can be run as a test.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(_HERE, "..", "src")]
+
+import utime
+import cotask
+import task_share
+import cosync
+import link
+
+## The follower clock's offset from the leader's, in microseconds.
+OFFSET = 123456789
+## How much faster the follower's clock runs, in parts per million.
+DRIFT_PPM = 50
+## The largest skew in microseconds allowed between the boards' samples.
+MAX_SKEW = 500
+## The longest time in microseconds a mirrored share may take to arrive.
+MAX_LATENCY = 10000
+
+
+def follower_clock():
+    """!@brief      The follower's clock, which is offset from the leader's and drifts.
+    """
+    now = utime.ticks_us()
+    return utime.ticks_add(now, OFFSET + now * DRIFT_PPM // 1000000)
+
+
+class Board:
+    """!@brief      One simulated board with its own scheduler and shares.
+    """
+
+    def __init__(self, name, end, leader, clock):
+        """!@brief          Sets up a board's task list, share and sync task.
+            @param name     The board's name.
+            @param end      Its end of the serial link.
+            @param leader   True for the leader board.
+            @param clock    The board's clock function.
+        """
+        ## The board's name.
+        self.name = name
+        ## The board's clock function.
+        self.clock = clock
+        ## The board's own task list.
+        self.tasks = cotask.TaskList()
+        ## A share mirrored between the boards.
+        self.share = task_share.Share('l', thread_protect=False,
+                                      name=name + " pos")
+        ## The leader clock times at which the sampling task ran.
+        self.samples = []
+        ## The link to the other board.
+        self.sync = cosync.CoSync(end, self.tasks, leader=leader, clock=clock)
+        self.sync.mirror(self.share, 0)
+        self.tasks.append(cotask.Task(self.sync.run, name="Sync", priority=2,
+                                      period=1))
+        self.tasks.append(cotask.Task(self.sample, name="Sample", priority=1,
+                                      period=10))
+
+    def sample(self):
+        """!@brief      A task which notes when it runs, once started.
+        """
+        while True:
+            if self.sync.started:
+                self.samples.append(self.sync.leader_time())
+            yield 0
+
+
+if __name__ == "__main__":
+    utime.use_virtual_clock(1000)
+    end_a, end_b = link.pipe_pair(latency=200)
+    leader = Board("Leader", end_a, True, utime.ticks_us)
+    follower = Board("Follower", end_b, False, follower_clock)
+
+    started = False
+    sent_at = None
+    arrived = None
+    for step in range(50000):                  # 5 seconds of 100 us steps
+        utime.advance(100)
+        leader.tasks.pri_sched()
+        follower.tasks.pri_sched()
+        if not started and follower.sync.synced:
+            leader.sync.start(50)
+            started = True
+        if step == 30000:
+            leader.share.put(4242)
+            sent_at = utime.ticks_us()
+        if sent_at is not None and arrived is None \
+                and follower.share.get() == 4242:
+            arrived = utime.ticks_us()
+
+    print("Offset found {} us, actual {} us, round trip {} us".format(
+        follower.sync.offset, -OFFSET - utime.ticks_us() * DRIFT_PPM // 1000000,
+        follower.sync.rtt))
+    pairs = list(zip(leader.samples, follower.samples))
+    skew = max(abs(utime.ticks_diff(b, a)) for a, b in pairs) if pairs \
+        else None
+    print("{} samples on each board, largest skew {} us".format(
+        len(pairs), skew))
+    latency = None if arrived is None else utime.ticks_diff(arrived, sent_at)
+    print("Mirrored share arrived after {} us".format(latency))
+
+    # Five seconds less the time taken to sync should give over 400 samples
+    if len(pairs) < 400 or skew > MAX_SKEW:
+        sys.exit("Samples out of step: {} pairs, skew {} us (limit {} us)"
+                 .format(len(pairs), skew, MAX_SKEW))
+    if latency is None or latency > MAX_LATENCY:
+        sys.exit("Mirrored share took {} us (limit {} us)".format(
+            latency, MAX_LATENCY))
+    print("Skew and latency within limits")
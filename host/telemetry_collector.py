@@ -0,0 +1,188 @@
+"""!@file telemetry_collector.py
+@brief      Collects telemetry snapshots from a board into time series.
+@details    Contains the "Collector" class, which runs on the host computer.
+            It reads the binary snapshots written by @c telemetry.py from a
+            serial port, pipe or file, and appends each task's and queue's
+            statistics to time series which can be plotted or saved. The
+            snapshot layout must match the formats in @c src/telemetry.py.
+
+            Each snapshot's CRC is checked and its task and queue counts are
+            bounded before it's used. A snapshot which fails either check
+            is skipped by moving on to the next sync bytes, so a lost or
+            corrupted byte only costs the snapshot it was in.
+
+            Example:
+            @code
+            import serial
+            collector = Collector(task_names=["Task_1", "Task_2"])
+            collector.read_from(serial.Serial("/dev/ttyACM0", 115200, timeout=1))
+            print(collector.tasks["Task_1"]["max_dur"])
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import binascii
+import struct
+
+## The two bytes which begin every snapshot.
+SYNC = b'\xa5\x5a'
+## Snapshot header: sync, sequence number, time in us, task count, queue count.
+HEADER_FMT = '<2sHIBB'
+## Per-task record: runs, avg/max duration, avg/max lateness, overruns.
+TASK_FMT = '<IIIIIH'
+## Per-queue record: maximum number of items held, size of the queue.
+QUEUE_FMT = '<HH'
+## Snapshot trailer: CRC-16/CCITT-FALSE of the header and records.
+CRC_FMT = '<H'
+
+## The most task records a snapshot is believed to hold.
+MAX_TASKS = 64
+## The most queue records a snapshot is believed to hold.
+MAX_QUEUES = 64
+
+## The names of the time series kept for each task, in snapshot order.
+TASK_FIELDS = ("runs", "avg_dur", "max_dur", "avg_late", "max_late", "overruns")
+## The names of the time series kept for each queue, in snapshot order.
+QUEUE_FIELDS = ("max_full", "size")
+
+# MicroPython's ticks_us() wraps around at 2**30
+_TICKS_PERIOD = 1 << 30
+
+
+class Collector:
+    """!@brief      Decodes telemetry snapshots and aggregates them.
+       @details     Bytes may be fed in chunks of any size; partial snapshots
+                    are kept until the rest arrives, and bytes which don't
+                    belong to a good snapshot are skipped.
+    """
+
+    def __init__(self, task_names=(), queue_names=()):
+        """!@brief              Initializes a collector.
+            @param task_names   Names for the tasks in the order in which they
+                                appear in a snapshot; unnamed tasks are called
+                                @c Task0, @c Task1 and so on.
+            @param queue_names  Names for the queues, in snapshot order.
+        """
+        ## Names given to the tasks, in snapshot order.
+        self.task_names = list(task_names)
+        ## Names given to the queues, in snapshot order.
+        self.queue_names = list(queue_names)
+        ## Time of each snapshot in seconds since the first one.
+        self.time = []
+        ## Time series for each task, as a dictionary of task names to
+        #  dictionaries of field names to lists of values.
+        self.tasks = {}
+        ## Time series for each queue, arranged as for @c tasks.
+        self.queues = {}
+        ## The number of snapshots lost, found from gaps in sequence numbers.
+        self.lost = 0
+        ## The number of times a frame was thrown away because its counts
+        #  were too large or its CRC was wrong.
+        self.bad = 0
+        self._pending = bytearray()
+        self._last_seq = None
+        self._last_ticks = None
+        self._elapsed = 0
+
+    def feed(self, data):
+        """!@brief          Decodes as many snapshots as possible from some bytes.
+            @param data     Bytes received from the board.
+            @return         The number of snapshots decoded.
+        """
+        self._pending += data
+        header_size = struct.calcsize(HEADER_FMT)
+        crc_size = struct.calcsize(CRC_FMT)
+        count = 0
+        while True:
+            start = self._pending.find(SYNC)
+            if start < 0:
+                # Keep a trailing byte in case it's the start of a sync pair
+                del self._pending[:-1]
+                return count
+            del self._pending[:start]
+            if len(self._pending) < header_size:
+                return count
+            sync, seq, ticks, n_tasks, n_queues = struct.unpack_from(
+                HEADER_FMT, self._pending, 0)
+            if n_tasks > MAX_TASKS or n_queues > MAX_QUEUES:
+                self._skip()
+                continue
+            size = (header_size + n_tasks * struct.calcsize(TASK_FMT)
+                    + n_queues * struct.calcsize(QUEUE_FMT) + crc_size)
+            if len(self._pending) < size:
+                return count
+            body = size - crc_size
+            crc, = struct.unpack_from(CRC_FMT, self._pending, body)
+            if binascii.crc_hqx(self._pending[:body], 0xFFFF) != crc:
+                self._skip()
+                continue
+            self._decode(seq, ticks, n_tasks, n_queues)
+            del self._pending[:size]
+            count += 1
+
+    def _skip(self):
+        """!@brief          Throws away a bad frame's sync bytes.
+            @details        Only the first byte is dropped, so a good frame
+                            which starts inside the bad one is still found.
+        """
+        del self._pending[:1]
+        self.bad += 1
+
+    def read_from(self, stream, chunk=4096):
+        """!@brief          Reads and decodes snapshots until a stream runs dry.
+            @param stream   An object with a @c read() method, such as a
+                            serial port or a pipe; reading stops when it
+                            returns no data.
+            @param chunk    The number of bytes to ask for with each read.
+            @return         The total number of snapshots decoded.
+        """
+        total = 0
+        while True:
+            data = stream.read(chunk)
+            if not data:
+                return total
+            total += self.feed(data)
+
+    def _decode(self, seq, ticks, n_tasks, n_queues):
+        """!@brief          Appends one complete snapshot to the time series.
+            @param seq      The snapshot's sequence number.
+            @param ticks    The board's time in microseconds, which wraps.
+            @param n_tasks  The number of task records in the snapshot.
+            @param n_queues The number of queue records in the snapshot.
+        """
+        if self._last_seq is not None:
+            self.lost += (seq - self._last_seq - 1) & 0xFFFF
+            self._elapsed += (ticks - self._last_ticks) % _TICKS_PERIOD
+        self._last_seq = seq
+        self._last_ticks = ticks
+        self.time.append(self._elapsed / 1e6)
+
+        offset = struct.calcsize(HEADER_FMT)
+        for idx in range(n_tasks):
+            record = struct.unpack_from(TASK_FMT, self._pending, offset)
+            self._append(self.tasks, self._name(self.task_names, "Task", idx),
+                         TASK_FIELDS, record)
+            offset += struct.calcsize(TASK_FMT)
+        for idx in range(n_queues):
+            record = struct.unpack_from(QUEUE_FMT, self._pending, offset)
+            self._append(self.queues,
+                         self._name(self.queue_names, "Queue", idx),
+                         QUEUE_FIELDS, record)
+            offset += struct.calcsize(QUEUE_FMT)
+
+    @staticmethod
+    def _name(names, prefix, idx):
+        """!@brief          Finds the name of a task or queue by its position.
+        """
+        return names[idx] if idx < len(names) else prefix + str(idx)
+
+    @staticmethod
+    def _append(series, name, fields, record):
+        """!@brief          Adds one record's values to the named time series.
+        """
+        columns = series.setdefault(name, {field: [] for field in fields})
+        for field, value in zip(fields, record):
+            columns[field].append(value)
@@ -0,0 +1,332 @@
+"""!@file test_cotask.py
+@brief      Checks the cotask scheduler on the virtual clock.
+@details    Tasks are run by @c src/cotask.py with the host stand-ins, and
+            time only moves when a test moves it, so release times, budgets
+            and frames can be checked exactly. Covers the order in which
+            @c pri_sched() dispatches tasks, the frame table made by
+            @c align(), overrun handling, @c freeze() and @c idle_collect(),
+            and task lists run inside other task lists. Run with @c pytest,
+            or on its own:
+            @code
+            python host/test_cotask.py
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(_HERE, "..", "src")]
+
+import utime
+import cotask
+
+
+def _logger(log, name, work=0):
+    """!@brief          Makes a task function which logs each of its runs.
+        @param log      The list to which the name and time of each run are
+                        appended.
+        @param name     The name logged.
+        @param work     The number of microseconds each run takes.
+    """
+    def run():
+        while True:
+            log.append((name, utime.ticks_us()))
+            utime.advance(work)
+            yield 0
+    return run
+
+
+def _names(log):
+    return [name for name, when in log]
+
+
+class _Polled(cotask.Task):
+    """!@brief      A task which is ready while it has items waiting, without
+                    anything calling go().
+    """
+
+    def __init__(self, log, **kwargs):
+        super().__init__(self._run, **kwargs)
+        self.waiting = []
+        self._log = log
+
+    def _run(self):
+        while True:
+            self._log.append((self.waiting.pop(0), utime.ticks_us()))
+            yield 0
+
+    def ready(self):
+        return len(self.waiting) > 0 or self.go_flag
+
+
+class _Heap:
+    """!@brief      Stands in for MicroPython's garbage collector functions.
+       @details     The memory in use is set by the test, and a collection
+                    takes a set time on the virtual clock.
+    """
+
+    def __init__(self, collect_time):
+        self.used = 0
+        self.floor = 0
+        self.collections = 0
+        self._collect_time = collect_time
+
+    def mem_alloc(self):
+        return self.used
+
+    def collect(self):
+        self.collections += 1
+        self.used = self.floor
+        utime.advance(self._collect_time)
+
+    def enable(self):
+        pass
+
+    def disable(self):
+        pass
+
+
+def test_highest_priority_first():
+    utime.use_virtual_clock(0)
+    log = []
+    task_list = cotask.TaskList()
+    low = cotask.Task(_logger(log, "low"), name="low", priority=1)
+    high = cotask.Task(_logger(log, "high"), name="high", priority=5)
+    task_list.append(low)
+    task_list.append(high)
+    low.go()
+    high.go()
+    # One task runs per call, the higher priority one first
+    task_list.pri_sched()
+    assert _names(log) == ["high"]
+    task_list.pri_sched()
+    task_list.pri_sched()
+    assert _names(log) == ["high", "low"]
+
+
+def test_round_robin_within_level():
+    utime.use_virtual_clock(0)
+    log = []
+    task_list = cotask.TaskList()
+    tasks = [cotask.Task(_logger(log, name), name=name, priority=2)
+             for name in "ABC"]
+    for task in tasks:
+        task_list.append(task)
+    for rounds in range(2):
+        for task in tasks:
+            task.go()
+        for task in tasks:
+            task_list.pri_sched()
+    assert _names(log) == list("ABCABC")
+
+
+def test_untimed_task_without_go():
+    utime.use_virtual_clock(0)
+    log = []
+    task_list = cotask.TaskList()
+    polled = _Polled(log, name="polled", priority=3)
+    flagged = cotask.Task(_logger(log, "flagged"), name="flagged", priority=1)
+    task_list.append(polled)
+    task_list.append(flagged)
+    polled.waiting.extend(["first", "second"])
+    flagged.go_flag = True
+    for calls in range(5):
+        task_list.pri_sched()
+    assert _names(log) == ["first", "second", "flagged"]
+
+
+def test_timed_release_count():
+    utime.use_virtual_clock(0)
+    log = []
+    task_list = cotask.TaskList()
+    task_list.append(cotask.Task(_logger(log, "fast"), name="fast",
+                                 priority=2, period=10))
+    task_list.append(cotask.Task(_logger(log, "slow"), name="slow",
+                                 priority=1, period=50))
+    # Run until just after the releases at 1 s
+    for step in range(10005):
+        utime.advance(100)
+        task_list.pri_sched()
+    assert _names(log).count("fast") == 100
+    assert _names(log).count("slow") == 20
+
+
+def test_align_finds_collisions():
+    utime.use_virtual_clock(0)
+    task_list = cotask.TaskList('frame')
+    task_list.append(cotask.Task(_logger([], "A"), name="A", priority=1,
+                                 period=10))
+    task_list.append(cotask.Task(_logger([], "B"), name="B", priority=2,
+                                 period=50, phase=5))
+    assert task_list.align() == []
+    assert task_list.minor_frame == 5000
+    assert task_list.major_frame == 50000
+    assert len(task_list.frame_table) == 10
+
+    task_list = cotask.TaskList('frame')
+    task_list.append(cotask.Task(_logger([], "A"), name="A", priority=1,
+                                 period=10))
+    task_list.append(cotask.Task(_logger([], "B"), name="B", priority=2,
+                                 period=50))
+    assert task_list.align() == [0]
+    assert [task.name for task in task_list.frame_table[0]] == ["B", "A"]
+
+
+def test_align_rejects_periods_which_are_not_harmonic():
+    utime.use_virtual_clock(0)
+    task_list = cotask.TaskList('frame')
+    task_list.append(cotask.Task(_logger([], "A"), name="A", period=10))
+    task_list.append(cotask.Task(_logger([], "B"), name="B", period=15))
+    try:
+        task_list.align()
+    except ValueError:
+        pass
+    else:
+        assert False, "align() accepted periods of 10 and 15 ms"
+
+
+def test_frame_release_counts_and_phases():
+    utime.use_virtual_clock(0)
+    log = []
+    task_list = cotask.TaskList('frame')
+    task_list.append(cotask.Task(_logger(log, "A"), name="A", priority=1,
+                                 period=10))
+    task_list.append(cotask.Task(_logger(log, "B"), name="B", priority=2,
+                                 period=50, phase=5))
+    task_list.align(start=1000)
+    for step in range(10000):
+        utime.advance(100)
+        task_list.frame_sched()
+    a_times = [when for name, when in log if name == "A"]
+    b_times = [when for name, when in log if name == "B"]
+    assert len(a_times) == 100
+    assert len(b_times) == 20
+    # Every release is in the first step after its slot starts
+    assert all((when - 1000) % 10000 <= 100 for when in a_times)
+    assert all((when - 6000) % 50000 <= 100 for when in b_times)
+
+
+def test_overrun_skips_a_release_and_keeps_the_phase():
+    utime.use_virtual_clock(0)
+    log = []
+    dts = []
+    hooked = []
+
+    def slow():
+        while True:
+            log.append(("slow", utime.ticks_us()))
+            dts.append(task.dt)
+            utime.advance(2000)
+            yield 0
+
+    task_list = cotask.TaskList()
+    task = cotask.Task(slow, name="slow", priority=1, period=10, phase=3,
+                       budget=1, on_overrun=hooked.append, overrun_limit=3)
+    task_list.append(task)
+    task_list.align(minor=1, start=0)
+    for step in range(12000):
+        utime.advance(10)
+        task_list.pri_sched()
+    times = [when for name, when in log]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert task.overruns == len(times) == len(hooked)
+    assert task.period == 10000
+    # Every third overrun costs the next release, and no other releases
+    assert gaps[:6] == [10000, 10000, 20000, 10000, 10000, 20000]
+    assert all(when % 10000 == 3010 for when in times)
+    # The release after a skipped one sees the real time since the last
+    assert dts[3] == 20000 and dts[4] == 10000
+
+
+def test_budget_starts_when_the_task_runs():
+    utime.use_virtual_clock(0)
+    task_list = cotask.TaskList()
+    hog = cotask.Task(_logger([], "hog", work=3000), name="hog", priority=2,
+                      period=10)
+    quick = cotask.Task(_logger([], "quick"), name="quick", priority=1,
+                        period=10, budget=1)
+    task_list.append(hog)
+    task_list.append(quick)
+    for step in range(20000):
+        utime.advance(10)
+        task_list.pri_sched()
+    # The time the quick task spent waiting for the hog isn't charged to it
+    assert quick.overruns == 0
+    assert quick.period == 10000
+
+
+def test_freeze_and_idle_collect():
+    utime.use_virtual_clock(0)
+    heap = _Heap(collect_time=2000)
+    real_gc = cotask.gc
+    cotask.gc = heap
+    try:
+        task_list = cotask.TaskList()
+        task_list.append(cotask.Task(_logger([], "A"), name="A", period=10))
+        task_list.freeze()
+        try:
+            task_list.append(cotask.Task(_logger([], "B"), name="B"))
+        except RuntimeError:
+            pass
+        else:
+            assert False, "a task was added to a frozen list"
+        assert heap.collections == 1
+
+        # Too little garbage to be worth collecting
+        heap.used = 100
+        assert not task_list.idle_collect(threshold=4096)
+        # Enough garbage and a long gap before the task is due
+        heap.used = 5000
+        assert task_list.idle_collect(threshold=4096)
+        assert heap.collections == 2
+        # The gap is now shorter than a collection was seen to take
+        task_list.tasks[0]._next_run = utime.ticks_add(utime.ticks_us(), 2400)
+        heap.used = 5000
+        assert not task_list.idle_collect(threshold=4096)
+        task_list.tasks[0]._next_run = utime.ticks_add(utime.ticks_us(), 2600)
+        assert task_list.idle_collect(threshold=4096)
+        task_list.thaw()
+    finally:
+        cotask.gc = real_gc
+
+
+def test_nested_list_keeps_running():
+    utime.use_virtual_clock(0)
+    log = []
+    inner = cotask.TaskList('rr')
+    inner.append(cotask.Task(_logger(log, "inner"), name="inner",
+                             priority=0, period=10))
+    outer = cotask.TaskList('pri')
+    outer.append(cotask.Task(_logger(log, "outer"), name="outer",
+                             priority=1, period=50))
+    outer.append(inner.as_task(name="Inner list"))
+    # Run for longer than half the range of ticks_us(), after which a task
+    # whose next run time doesn't move forward looks far in the future
+    step = 2000
+    for calls in range((600000000 + 5000) // step):
+        utime.advance(step)
+        outer.sched()
+    names = _names(log)
+    assert names.count("outer") == 12000
+    # A pass which runs the outer task doesn't run the inner list, which
+    # catches up on its next pass
+    assert names.count("inner") == 60000
+    late = [when for name, when in log if name == "inner" and when > 550000000]
+    assert len(late) > 4000
+
+
+def teardown_module():
+    utime.use_real_clock()
+
+
+if __name__ == "__main__":
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(name, "passed")
+    teardown_module()
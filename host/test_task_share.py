@@ -0,0 +1,121 @@
+"""!@file test_task_share.py
+@brief      Checks the statistics kept by task_share queues.
+@details    Queues from @c src/task_share.py are filled and drained with the
+            host stand-ins, and the counts of lost items and stalled puts, the
+            fill-level histogram, the rates and the recommended size are
+            checked. Run with @c pytest, or on its own:
+            @code
+            python host/test_task_share.py
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import os
+import sys
+import threading
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(_HERE, "..", "src")]
+
+import utime
+import task_share
+
+
+def _queue(size, **kwargs):
+    """!@brief          Makes a queue of 16-bit integers kept out of share_list.
+    """
+    return task_share.Queue('h', size, name="Q", registry=[], **kwargs)
+
+
+def test_fill_and_drain():
+    queue = _queue(4, profile=True)
+    for item in range(3):
+        queue.put(item)
+    assert queue.max_full() == 3
+    assert [queue.get() for item in range(3)] == [0, 1, 2]
+    assert queue.empty()
+    # Fill levels 1, 2 and 3 of 4 fall in bins 0, 2 and 4 of 8
+    assert list(queue.histogram()) == [1, 0, 1, 0, 1, 0, 0, 0]
+    assert queue.lost() == 0 and queue.stalls() == 0
+    assert queue.recommend_size() == 3 + 3 // 4 + 1
+
+
+def test_overwrites_are_lost():
+    queue = _queue(4, overwrite=True)
+    for item in range(7):
+        queue.put(item)
+    assert queue.num_in() == 4
+    assert queue.lost() == 3 and queue.stalls() == 0
+    # The most items held plus the longest run of lost puts, and a margin
+    assert queue.recommend_size() == 7 + 7 // 4 + 1
+    # A get ends the run of lost puts, so a later one starts a new run
+    queue.get()
+    queue.put(7)
+    queue.put(8)
+    assert queue.lost() == 4
+    assert queue.recommend_size() == 7 + 7 // 4 + 1
+
+
+def test_puts_from_an_interrupt_are_dropped():
+    queue = _queue(2)
+    queue.put(1)
+    queue.put(2)
+    queue.put(3, in_ISR=True)
+    queue.put(4, in_ISR=True)
+    assert queue.lost() == 2 and queue.stalls() == 0
+    assert [queue.get(), queue.get()] == [1, 2]
+    assert queue.recommend_size() == 4 + 4 // 4 + 1
+
+
+def test_stalls_are_counted_apart():
+    queue = _queue(2)
+    queue.put(1)
+    queue.put(2)
+    # Another thread takes an item out while the put waits for room, as an
+    # interrupt or another task would on the board
+    taker = threading.Timer(0.05, queue.get)
+    taker.start()
+    queue.put(3)
+    taker.join()
+    assert queue.stalls() == 1
+    assert queue.lost() == 0
+    assert [queue.get(), queue.get()] == [2, 3]
+    assert queue.recommend_size(stalls=False) == 2 + 2 // 4 + 1
+    assert queue.recommend_size() == 3 + 3 // 4 + 1
+
+
+def test_rates_and_a_queue_which_cannot_keep_up():
+    utime.use_virtual_clock(0)
+    try:
+        queue = _queue(32, profile=True)
+        for tick in range(10):
+            utime.advance(100000)
+            queue.put(tick)
+            if tick % 2:
+                queue.get()
+        assert queue.rates() == (10.0, 5.0)
+        # Items arrive twice as fast as they leave, so no size is enough
+        assert queue.recommend_size() is None
+    finally:
+        utime.use_real_clock()
+
+
+def test_clear_resets_the_statistics():
+    queue = _queue(2, overwrite=True, profile=True)
+    for item in range(5):
+        queue.put(item)
+    queue.clear()
+    assert queue.max_full() == 0 and queue.lost() == 0
+    assert queue.stalls() == 0
+    assert list(queue.histogram()) == [0] * task_share.HIST_BINS
+    assert queue.recommend_size() == 1
+
+
+if __name__ == "__main__":
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(name, "passed")
@@ -0,0 +1,103 @@
+"""!@file test_telemetry.py
+@brief      Checks that telemetry snapshots survive the trip to the collector.
+@details    Snapshots are packed by @c src/telemetry.py with the host
+            stand-ins and decoded by @c telemetry_collector.py, including
+            streams which have lost or gained bytes. Run with @c pytest, or
+            on its own:
+            @code
+            python host/test_telemetry.py
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import binascii
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [_HERE, os.path.join(_HERE, "..", "src")]
+
+import cotask
+import task_share
+import telemetry
+import telemetry_collector
+
+
+class _Stream:
+    """!@brief      Keeps each snapshot written to it as a separate frame.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, buf):
+        self.frames.append(bytes(buf))
+
+
+def _idle():
+    while True:
+        yield 0
+
+
+def _frames(count):
+    """!@brief          Packs a number of snapshots of two tasks and a queue.
+        @return         A list of the snapshots' bytes.
+    """
+    task_list = cotask.TaskList()
+    task_list.append(cotask.Task(_idle, name="A", priority=1, period=10))
+    task_list.append(cotask.Task(_idle, name="B", priority=2, period=20))
+    registry = []
+    queue = task_share.Queue('h', 8, name="Q", registry=registry)
+    stream = _Stream()
+    sender = telemetry.Telemetry(stream, task_list, registry)
+    for idx in range(count):
+        queue.put(idx)
+        sender.send()
+        queue.get()
+    return stream.frames
+
+
+def test_crc_matches_host():
+    data = bytearray(range(200))
+    assert telemetry.crc16(data, len(data)) == binascii.crc_hqx(data, 0xFFFF)
+
+
+def test_clean_stream():
+    frames = _frames(20)
+    collector = telemetry_collector.Collector(["A", "B"])
+    # Feed the bytes one at a time so every partial frame is seen
+    for byte in b"".join(frames):
+        collector.feed(bytes([byte]))
+    assert len(collector.time) == 20
+    assert collector.lost == 0 and collector.bad == 0
+    assert collector.queues["Queue0"]["size"] == [8] * 20
+
+
+def test_dropped_byte_costs_one_frame():
+    frames = _frames(20)
+    frames[0] = frames[0][:5] + frames[0][6:]
+    collector = telemetry_collector.Collector(["A", "B"])
+    assert collector.feed(b"".join(frames)) == 19
+    assert collector.lost == 0
+    assert collector.bad >= 1
+
+
+def test_bad_counts_and_noise():
+    frames = _frames(5)
+    # A header claiming 255 tasks, and noise holding the sync bytes and a
+    # header for one task, which takes its record and CRC from the next frame
+    junk = telemetry_collector.SYNC + bytes([0, 0, 0, 0, 0, 0, 255, 255])
+    noise = b"\x00" + telemetry_collector.SYNC + bytes([1, 2, 3, 4, 5, 6, 1, 0])
+    collector = telemetry_collector.Collector()
+    assert collector.feed(junk + frames[0] + noise + b"".join(frames[1:])) == 5
+    assert collector.lost == 0
+
+
+if __name__ == "__main__":
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(name, "passed")
@@ -0,0 +1,310 @@
+"""!@file trace_analyzer.py
+@brief      Merges cotask transition traces into one timeline and charts them.
+@details    Contains the "TraceAnalyzer" class, which runs on the host computer.
+            It reads dumps of the strings returned by @c Task.get_trace() for
+            any number of tasks, merges the tasks' state transitions by time
+            into one timeline, and works out statistics for each task and for
+            the whole system: the gaps between transitions, the number of
+            gaps longer than a limit, the longest gap from one task's
+            transition to another's, and the quiet time in which no task
+            changed state. It can also draw the timeline as a Gantt chart in
+            an SVG file.
+
+            A trace only records changes of state, not releases or runs, so
+            these are not deadline misses or idle time: a task which stays in
+            one state runs many times without adding anything to its trace.
+            Lateness and run times are measured by the tasks' profiles, which
+            are sent by @c src/telemetry.py.
+
+            Dumps are read as streams: one pass finds where each task's
+            section of the file begins and how long the trace runs, and the
+            second pass reads all the sections side by side, merging them one
+            line at a time. Only a small amount of memory per task is needed,
+            so traces with millions of transitions can be analyzed.
+
+            Each task's trace times are counted from the time the task was
+            created, so tasks should be created together for their times to
+            line up.
+
+            Example:
+            @code
+            python trace_analyzer.py trace.txt --gap-limit Task_1=10 --svg trace.svg
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import argparse
+import heapq
+import re
+
+# A line starting a task's section, and a line holding one transition
+_HEADER = re.compile(r'^Task (.+?):(.*)$')
+_EVENT = re.compile(r'^\s*([-+\d.eE]+):\s*(-?\d+)\s*->\s*(-?\d+)\s*$')
+
+## Colors used for the states in a Gantt chart, repeating after the last.
+COLORS = ("#dddddd", "#4477aa", "#ee6677", "#228833", "#ccbb44", "#66ccee",
+          "#aa3377", "#bbbbbb")
+
+
+class TaskStats:
+    """!@brief      Holds the statistics worked out for one task.
+    """
+
+    def __init__(self, name, gap_limit=None):
+        """!@brief              Initializes an empty set of statistics.
+            @param name         The name of the task.
+            @param gap_limit    The longest time in seconds expected between
+                                the task's transitions, or None.
+        """
+        ## The name of the task.
+        self.name = name
+        ## The longest time in seconds expected between transitions, or None.
+        self.gap_limit = gap_limit
+        ## The number of transitions.
+        self.events = 0
+        ## The longest time in seconds between two transitions.
+        self.max_gap = 0.0
+        ## The number of gaps between transitions longer than the gap limit.
+        self.long_gaps = 0
+        ## The time in seconds of the last transition.
+        self.last = None
+
+    def __repr__(self):
+        """!@brief      Makes a line of text showing the statistics.
+        """
+        return '{:<16s}{:10d}{:12.6f}{:11d}'.format(self.name, self.events,
+                                                    self.max_gap,
+                                                    self.long_gaps)
+
+
+class TraceAnalyzer:
+    """!@brief      Merges and analyzes the traces of several tasks.
+    """
+
+    def __init__(self, paths, gap_limits=None, quiet_gap=0.001):
+        """!@brief              Indexes the trace files to be analyzed.
+            @param paths        The names of the files holding trace dumps. A
+                                file may hold the traces of several tasks.
+            @param gap_limits   A dictionary of task names to the longest time
+                                in seconds expected between that task's
+                                transitions.
+            @param quiet_gap    The shortest time in seconds without any
+                                transitions which is counted as quiet time.
+        """
+        gap_limits = gap_limits or {}
+        ## The shortest gap in seconds counted as quiet time.
+        self.quiet_gap = quiet_gap
+        ## A list of (file name, byte offset, task name) for each task section.
+        self.sections = []
+        ## The time in seconds of the last transition in any trace.
+        self.end = 0.0
+        for path in paths:
+            self._index(path)
+        ## Statistics for each task, by task name.
+        self.tasks = {name: TaskStats(name, gap_limits.get(name))
+                      for path, offset, name in self.sections}
+        ## The total time in seconds of gaps between transitions of any task
+        #  which are at least @c quiet_gap long.
+        self.quiet = 0.0
+        ## The longest time in seconds between one task's transition and the
+        #  next transition of a different task.
+        self.max_switch_gap = 0.0
+
+    def _index(self, path):
+        """!@brief          Finds where each task's section of a file begins.
+            @param path     The name of the file.
+        """
+        with open(path, 'rb') as file:
+            offset = 0
+            for raw in file:
+                line = raw.decode(errors='replace')
+                header = _HEADER.match(line)
+                if header:
+                    if 'not traced' not in header.group(2):
+                        self.sections.append((path, offset + len(raw),
+                                              header.group(1)))
+                else:
+                    event = _EVENT.match(line)
+                    if event:
+                        self.end = max(self.end, float(event.group(1)))
+                offset += len(raw)
+
+    @staticmethod
+    def _read_section(path, offset, name):
+        """!@brief          Generates the transitions in one task's section.
+            @param path     The name of the file.
+            @param offset   The byte offset at which the section's events begin.
+            @param name     The name of the task.
+            @return         A generator of (time, task name, from, to) tuples.
+        """
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            for raw in file:
+                event = _EVENT.match(raw.decode(errors='replace'))
+                if not event:
+                    return
+                yield (float(event.group(1)), name, int(event.group(2)),
+                       int(event.group(3)))
+
+    def events(self):
+        """!@brief      Generates the transitions of all the tasks in time order.
+            @return     A generator of (time, task name, from, to) tuples.
+        """
+        return heapq.merge(*(self._read_section(*section)
+                             for section in self.sections))
+
+    def analyze(self, chart=None):
+        """!@brief          Works out the statistics in one pass over the traces.
+            @param chart    A @c GanttChart to which each transition is also
+                            given, or None.
+            @return         The total number of transitions.
+        """
+        count = 0
+        prev_time = 0.0
+        prev_task = None
+        for time, name, old, new in self.events():
+            stats = self.tasks[name]
+            if stats.last is not None:
+                gap = time - stats.last
+                if gap > stats.max_gap:
+                    stats.max_gap = gap
+                if stats.gap_limit is not None and gap > stats.gap_limit:
+                    stats.long_gaps += 1
+            stats.last = time
+            stats.events += 1
+
+            gap = time - prev_time
+            if gap >= self.quiet_gap:
+                self.quiet += gap
+            if prev_task is not None and name != prev_task \
+                    and gap > self.max_switch_gap:
+                self.max_switch_gap = gap
+            prev_time = time
+            prev_task = name
+
+            if chart is not None:
+                chart.add(time, name, new)
+            count += 1
+        return count
+
+    def report(self):
+        """!@brief      Makes a text report of the statistics.
+            @return     A string with a line for each task and a summary.
+        """
+        lines = ['TASK                EVENTS     MAX GAP  LONG GAPS']
+        lines += [str(stats) for stats in self.tasks.values()]
+        lines.append('Trace length {:.6f} s, quiet {:.6f} s, longest gap '
+                     'between tasks {:.6f} s'.format(self.end, self.quiet,
+                                                     self.max_switch_gap))
+        return '\n'.join(lines)
+
+
+class GanttChart:
+    """!@brief      Draws task states over time as a Gantt chart.
+       @details     The time axis is split into a fixed number of pixel columns
+                    and only the state each task was in at the end of each
+                    column is kept, so the memory needed doesn't depend on how
+                    many transitions there are.
+    """
+
+    def __init__(self, names, end, width=1600, row_height=20):
+        """!@brief              Initializes an empty chart.
+            @param names        The names of the tasks, one per row.
+            @param end          The time in seconds at the right of the chart.
+            @param width        The number of pixel columns in the chart.
+            @param row_height   The height of each task's row in pixels.
+        """
+        ## The names of the tasks, one per row.
+        self.names = list(names)
+        ## The time in seconds at the right of the chart.
+        self.end = end if end > 0 else 1.0
+        ## The number of pixel columns.
+        self.width = width
+        ## The height of each row in pixels.
+        self.row_height = row_height
+        # For each task, the state in each column and the last column filled
+        self._rows = {name: bytearray(width) for name in self.names}
+        self._state = {name: 0 for name in self.names}
+        self._filled = {name: 0 for name in self.names}
+
+    def add(self, time, name, state):
+        """!@brief          Adds a transition to the chart.
+            @param time     The time of the transition in seconds.
+            @param name     The name of the task.
+            @param state    The state the task moved into.
+        """
+        column = min(int(time / self.end * self.width), self.width)
+        self._fill(name, column)
+        self._state[name] = state
+
+    def _fill(self, name, column):
+        """!@brief          Fills a task's row with its current state up to a column.
+        """
+        row = self._rows[name]
+        state = self._state[name] & 0xFF
+        for col in range(self._filled[name], column):
+            row[col] = state
+        self._filled[name] = max(self._filled[name], column)
+
+    def write_svg(self, path):
+        """!@brief          Writes the chart to an SVG file.
+            @param path     The name of the file to write.
+        """
+        label = 120
+        height = self.row_height * len(self.names) + 30
+        with open(path, 'w') as out:
+            out.write('<svg xmlns="http://www.w3.org/2000/svg" width="{}" '
+                      'height="{}" font-family="monospace" font-size="12">\n'
+                      .format(label + self.width, height))
+            for idx, name in enumerate(self.names):
+                self._fill(name, self.width)
+                y = idx * self.row_height
+                out.write('<text x="2" y="{}">{}</text>\n'.format(
+                    y + self.row_height - 6, name))
+                # Draw one rectangle for each run of columns in the same state
+                row = self._rows[name]
+                start = 0
+                for col in range(1, self.width + 1):
+                    if col == self.width or row[col] != row[start]:
+                        out.write('<rect x="{}" y="{}" width="{}" height="{}" '
+                                  'fill="{}"/>\n'.format(
+                                      label + start, y + 2, col - start,
+                                      self.row_height - 4,
+                                      COLORS[row[start] % len(COLORS)]))
+                        start = col
+            out.write('<text x="{}" y="{}">0 s</text>\n'.format(label,
+                                                                 height - 8))
+            out.write('<text x="{}" y="{}" text-anchor="end">{:.3f} s</text>\n'
+                      .format(label + self.width, height - 8, self.end))
+            out.write('</svg>\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze cotask traces.")
+    parser.add_argument("paths", nargs="+", help="files holding trace dumps")
+    parser.add_argument("--gap-limit", action="append", default=[],
+                        metavar="TASK=MS",
+                        help="longest expected gap between transitions")
+    parser.add_argument("--quiet-gap", type=float, default=1.0, metavar="MS",
+                        help="shortest gap counted as quiet time")
+    parser.add_argument("--svg", help="file in which to draw a Gantt chart")
+    parser.add_argument("--width", type=int, default=1600,
+                        help="width of the Gantt chart in pixels")
+    args = parser.parse_args()
+
+    gap_limits = {}
+    for item in args.gap_limit:
+        name, _, ms = item.rpartition("=")
+        gap_limits[name] = float(ms) / 1000
+    analyzer = TraceAnalyzer(args.paths, gap_limits, args.quiet_gap / 1000)
+    chart = None
+    if args.svg:
+        chart = GanttChart([name for path, offset, name in analyzer.sections],
+                           analyzer.end, args.width)
+    analyzer.analyze(chart)
+    print(analyzer.report())
+    if chart is not None:
+        chart.write_svg(args.svg)
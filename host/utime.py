@@ -0,0 +1,90 @@
+"""!@file utime.py
+@brief      Host stand-in for MicroPython's @c utime module.
+@details    Provides the tick functions used by the lab code, so that it can
+            run on a computer. Ticks wrap around at 2**30 as on the board. By
+            default they follow the computer's clock; after
+            @c use_virtual_clock() is called they only move when @c advance()
+            is called, so simulations and replays can run much faster than
+            real time.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import time
+
+# Ticks wrap around at this value, as they do on the board
+_PERIOD = 1 << 30
+
+# The virtual time in microseconds, or None when following the real clock
+_virtual = None
+
+
+def use_virtual_clock(start=0):
+    """!@brief          Stops the ticks from following the computer's clock.
+        @param start    The virtual time in microseconds to start from.
+    """
+    global _virtual
+    _virtual = start
+
+
+def use_real_clock():
+    """!@brief          Makes the ticks follow the computer's clock again.
+    """
+    global _virtual
+    _virtual = None
+
+
+def advance(us):
+    """!@brief          Moves the virtual clock forward.
+        @param us       The number of microseconds to move forward.
+    """
+    global _virtual
+    _virtual += us
+
+
+def ticks_us():
+    """!@brief          Gets the time in microseconds.
+    """
+    if _virtual is not None:
+        return _virtual % _PERIOD
+    return int(time.perf_counter() * 1000000) % _PERIOD
+
+
+def ticks_ms():
+    """!@brief          Gets the time in milliseconds.
+    """
+    if _virtual is not None:
+        return (_virtual // 1000) % _PERIOD
+    return int(time.perf_counter() * 1000) % _PERIOD
+
+
+def ticks_add(ticks, delta):
+    """!@brief          Adds a number of ticks to a tick value, wrapping around.
+    """
+    return (ticks + delta) % _PERIOD
+
+
+def ticks_diff(ticks1, ticks2):
+    """!@brief          Finds the signed difference between two tick values.
+    """
+    return ((ticks1 - ticks2 + _PERIOD // 2) % _PERIOD) - _PERIOD // 2
+
+
+def sleep_ms(ms):
+    """!@brief          Waits for a number of milliseconds.
+    """
+    if _virtual is not None:
+        advance(int(ms * 1000))
+    else:
+        time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    """!@brief          Waits for a number of microseconds.
+    """
+    if _virtual is not None:
+        advance(int(us))
+    else:
+        time.sleep(us / 1000000)
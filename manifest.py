@@ -0,0 +1,14 @@
+# MicroPython manifest which freezes the lab code into the firmware, so that it
+# runs straight from flash without being loaded and compiled at start-up. Build
+# the firmware with, for example:
+#   make -C ports/stm32 BOARD=NUCLEO_L476RG FROZEN_MANIFEST=/path/to/manifest.py
+# main.py is left out so that it can still be changed without a rebuild.
+
+module("boottime.py", base_path="src")
+module("cotask.py", base_path="src")
+module("task_share.py", base_path="src")
+module("motor_driver.py", base_path="src")
+module("encoder_reader.py", base_path="src")
+module("controller.py", base_path="src")
+module("supervisor.py", base_path="src")
+module("stepmetrics.py", base_path="src")
@@ -0,0 +1,164 @@
+"""!@file autotune.py
+@brief      Finds controller gains with a relay feedback experiment.
+@details    Contains the "RelayTuner" class, which is run as a task by the
+            cotask scheduler. It drives a motor with a relay (bang-bang)
+            controller, switching the duty cycle between plus and minus a set
+            amplitude each time the position crosses the setpoint. The motor
+            settles into an oscillation whose amplitude and period give the
+            ultimate gain and period of the loop, from which controller gains
+            are found with the Ziegler-Nichols rules. Each sample only updates
+            a few running sums, so nothing about the trajectory is stored.
+
+            Example:
+            @code
+            tuner = RelayTuner(my_motor, my_encoder, 16384)
+            cotask.task_list.append(cotask.Task(tuner.run, name="Tune",
+                                                priority=1, period=10))
+            # ... run the scheduler until tuner.done, then
+            Kp, Ki, Kd = tuner.pid_gains()
+            my_controller = PIDController(Kp, Ki, Kd, 16384, 10)
+            @endcode
+            The experiment should be run at, or close to, the period the
+            tuned task will run at, as the task period adds lag to the loop.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import math, utime
+
+
+class RelayTuner:
+    """!@brief      Runs a relay feedback experiment to tune a motor controller.
+       @details     The first full oscillation is ignored as the motor gets up
+                    to speed; the amplitude and period of the following ones
+                    are averaged.
+    """
+
+    def __init__(self, motor, encoder, Setpoint, amplitude=30, hysteresis=100,
+                 cycles=4, timeout=10):
+        """!@brief              Initializes a relay tuner.
+            @param motor        The motor driver used to drive the motor.
+            @param encoder      The encoder used to measure the motor's position.
+            @param Setpoint     The position, in ticks, about which to oscillate.
+            @param amplitude    The relay's duty cycle in percent.
+            @param hysteresis   The error in ticks which must be passed before
+                                the relay switches, to keep noise from
+                                chattering it.
+            @param cycles       The number of oscillations to average.
+            @param timeout      The number of seconds after which the experiment
+                                gives up if it hasn't finished.
+        """
+        ## The motor driver used to drive the motor.
+        self.motor = motor
+        ## The encoder used to measure the motor's position.
+        self.encoder = encoder
+        ## The position in ticks about which the motor is oscillated.
+        self.Setpoint = Setpoint
+        ## The relay's duty cycle in percent.
+        self.amplitude = amplitude
+        ## The error in ticks the relay needs to see before it switches.
+        self.hysteresis = hysteresis
+        ## The number of oscillations which are averaged.
+        self.cycles = cycles
+        ## The time in seconds after which the experiment gives up.
+        self.timeout = timeout
+        ## The ultimate gain in percent duty cycle per tick, once found.
+        self.Ku = None
+        ## The ultimate period in seconds, once found.
+        self.Tu = None
+        ## True once the experiment has finished, whether or not it succeeded.
+        self.done = False
+
+    def run(self):
+        """!@brief      A generator which runs the experiment one sample at a time.
+            @details    Pass this method to @c cotask.Task. When the experiment
+                        is over the motor is turned off, @c done is set and
+                        @c Ku and @c Tu hold the results (or None if the
+                        motor never oscillated before the timeout).
+        """
+        self.encoder.zero()
+        start = utime.ticks_us()
+        relay = self.amplitude
+        high = low = 0              # Extremes of the position in this cycle
+        last_rise = None            # Time of the last upward switch
+        n_cycles = 0
+        period_sum = 0
+        amp_sum = 0
+
+        while True:
+            position = self.encoder.read_encoder()
+            now = utime.ticks_us()
+            error = self.Setpoint - position
+            if position > high:
+                high = position
+            if position < low:
+                low = position
+
+            # Switch the relay up when the position drops below the setpoint;
+            # each upward switch ends one cycle of the oscillation
+            if relay < 0 and error > self.hysteresis:
+                relay = self.amplitude
+                if last_rise is not None:
+                    n_cycles += 1
+                    # Skip the first cycle, in which the motor gets going
+                    if n_cycles > 1:
+                        period_sum += utime.ticks_diff(now, last_rise)
+                        amp_sum += high - low
+                last_rise = now
+                high = low = position
+            elif relay > 0 and error < -self.hysteresis:
+                relay = -self.amplitude
+
+            if n_cycles > self.cycles:
+                break
+            if utime.ticks_diff(now, start) > self.timeout * 1000000:
+                break
+            self.motor.set_duty_cycle(relay)
+            yield 0
+
+        self.motor.set_duty_cycle(0)
+        if n_cycles > 1:
+            # Average half of the peak-to-peak swing, corrected for hysteresis
+            a = amp_sum / (2 * (n_cycles - 1))
+            if a > self.hysteresis:
+                self.Ku = 4 * self.amplitude / (math.pi * math.sqrt(
+                    a * a - self.hysteresis * self.hysteresis))
+                self.Tu = period_sum / (n_cycles - 1) / 1000000
+        self.done = True
+        while True:
+            yield 0
+
+    def p_gain(self):
+        """!@brief      Finds a proportional gain for use with a P controller.
+            @return     The Ziegler-Nichols proportional gain, half the
+                        ultimate gain.
+        """
+        self._check()
+        return 0.5 * self.Ku
+
+    def pid_gains(self):
+        """!@brief          Finds PID gains for use with a PID controller.
+            @details        The gains are the continuous Ziegler-Nichols ones,
+                            as taken by @c controller.PIDController, which
+                            scales them by the task's period itself.
+            @return         A tuple of the proportional gain, the integral gain
+                            per second and the derivative gain in seconds.
+        """
+        self._check()
+        Kp = 0.6 * self.Ku
+        Ki = Kp / (self.Tu / 2)
+        Kd = Kp * self.Tu / 8
+        return (Kp, Ki, Kd)
+
+    def _check(self):
+        """!@brief      Makes sure the experiment found the ultimate gain and period.
+            @details    Raises @c RuntimeError if the experiment is still
+                        running, or if it timed out or never swung past the
+                        hysteresis, so no gains can be worked out.
+        """
+        if not self.done:
+            raise RuntimeError("relay test has not finished")
+        if self.Ku is None or self.Tu is None:
+            raise RuntimeError("relay test did not converge")
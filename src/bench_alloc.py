@@ -0,0 +1,93 @@
+"""!@file bench_alloc.py
+@brief      Measures the memory allocated by one step of motor control.
+@details    Runs the control step from @c main.py many times in two ways and
+            reports the bytes allocated per step: the float path, with
+            @c CLController and @c MotorDriver.set_duty_cycle(), and the
+            fixed-point path, with @c QController and
+            @c MotorDriver.set_duty_raw(). On the board the fixed-point path
+            should allocate nothing, while each float operation in the float
+            path allocates a new float object which the garbage collector
+            must later clean up.
+
+            On the board, copy this file with the lab code and run it with
+            @c import @c bench_alloc. It also runs on a computer with the host
+            stand-ins, using @c tracemalloc in place of @c gc.mem_alloc():
+            @code
+            PYTHONPATH=host python src/bench_alloc.py
+            @endcode
+            but there CPython makes objects for most integers as well, so only
+            the board's numbers mean anything.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import gc, pyb
+from motor_driver import MotorDriver
+from encoder_reader import encoder
+from controller import CLController, QController
+
+## The number of control steps run in each test.
+STEPS = 1000
+
+try:
+    _mem_alloc = gc.mem_alloc
+except AttributeError:
+    # CPython has no gc.mem_alloc(), so count traced allocations instead
+    import tracemalloc
+    tracemalloc.start()
+
+    def _mem_alloc():
+        return tracemalloc.get_traced_memory()[0]
+
+
+def float_step(motor, enc, ctrl):
+    """!@brief      Runs one control step with a float gain and percent duty cycle.
+    """
+    motor.set_duty_cycle(ctrl.run(enc.read_encoder()))
+
+
+def fixed_step(motor, enc, ctrl):
+    """!@brief      Runs one control step with integer gain and compare counts.
+    """
+    motor.set_duty_raw(ctrl.run(enc.read_encoder()))
+
+
+def measure(step, motor, enc, ctrl):
+    """!@brief          Finds the memory allocated by a control step.
+        @param step     The function which runs one step.
+        @return         The average number of bytes allocated per step.
+    """
+    step(motor, enc, ctrl)
+    gc.collect()
+    gc.disable()
+    before = _mem_alloc()
+    for _ in range(STEPS):
+        step(motor, enc, ctrl)
+    after = _mem_alloc()
+    gc.enable()
+    return (after - before) / STEPS
+
+
+def run():
+    """!@brief      Runs both tests and prints the bytes allocated per step.
+    """
+    motor = MotorDriver(pyb.Pin.board.PA10, pyb.Pin.board.PB4,
+                        pyb.Pin.board.PB5, 3)
+    enc = encoder(pyb.Pin.board.PC6, pyb.Pin.board.PC7, 8)
+    enc.zero()
+    # A gain of 0.10% per tick, as in main.py, in compare counts per tick
+    qgain = .10 * motor.full_scale / 100
+    results = [
+        ('float', measure(float_step, motor, enc, CLController(.10, 16384))),
+        ('fixed point', measure(fixed_step, motor, enc,
+                                QController(qgain, 16384, motor.full_scale))),
+        ]
+    motor.set_duty_cycle(0)
+    print('CONTROL STEP     BYTES PER STEP')
+    for label, took in results:
+        print('{:<16s}{:15.1f}'.format(label, took))
+
+
+run()
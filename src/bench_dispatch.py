@@ -0,0 +1,136 @@
+"""!@file bench_dispatch.py
+@brief      Compares the cost of running generator tasks and state table tasks.
+@details    Times how long the scheduler takes to run a task made from a
+            generator, like the tasks in @c main.py, and the same task made
+            with @c cotask.StateTask from a table of step functions. Each task
+            has three states which do almost nothing, so the times are mostly
+            the cost of getting to the code of the right state. Each kind of
+            task is timed both on its own, by resuming the generator or calling
+            the table's function directly, and through @c Task.schedule() with
+            profiling on and off.
+
+            On the board, copy this file with @c cotask.py and run it with
+            @c import @c bench_dispatch. On a computer, run it from the top of
+            the repository with the host stand-ins on the path:
+            @code
+            PYTHONPATH=host python src/bench_dispatch.py
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import utime
+import cotask
+
+## The number of steps timed for each test.
+STEPS = 10000
+
+
+def gen_fun():
+    """!@brief      A generator task with three states, written like @c CLC_fun1.
+    """
+    state = 0
+    count = 0
+    while True:
+        if state == 0:
+            count = 0
+            state = 1
+        elif state == 1:
+            count += 1
+            if count >= 10:
+                state = 2
+        elif state == 2:
+            state = 0
+        yield state
+
+
+class Steps:
+    """!@brief      The same three states as @c gen_fun(), as step functions.
+    """
+
+    def __init__(self):
+        ## A counter which stands in for the task's work.
+        self.count = 0
+
+    def init(self):
+        """!@brief      Starts counting; the first state.
+        """
+        self.count = 0
+        return 1
+
+    def counting(self):
+        """!@brief      Counts to ten; the second state.
+        """
+        self.count += 1
+        return 2 if self.count >= 10 else 1
+
+    def done(self):
+        """!@brief      Goes back to the start; the third state.
+        """
+        return 0
+
+    def table(self):
+        """!@brief      Makes the state table for a @c StateTask.
+            @return     A list of the step functions, indexed by state.
+        """
+        return [self.init, self.counting, self.done]
+
+
+def time_raw_gen():
+    """!@brief      Times resuming the generator directly.
+        @return     The time taken by @c STEPS steps, in microseconds.
+    """
+    gen = gen_fun()
+    start = utime.ticks_us()
+    for _ in range(STEPS):
+        next(gen)
+    return utime.ticks_diff(utime.ticks_us(), start)
+
+
+def time_raw_table():
+    """!@brief      Times calling the step functions directly from the table.
+        @return     The time taken by @c STEPS steps, in microseconds.
+    """
+    table = Steps().table()
+    state = 0
+    start = utime.ticks_us()
+    for _ in range(STEPS):
+        state = table[state]()
+    return utime.ticks_diff(utime.ticks_us(), start)
+
+
+def time_task(task):
+    """!@brief          Times running a task through the scheduler's @c schedule().
+        @param task     A task with no period, which is set going for each step.
+        @return         The time taken by @c STEPS steps, in microseconds.
+    """
+    start = utime.ticks_us()
+    for _ in range(STEPS):
+        task.go_flag = True
+        task.schedule()
+    return utime.ticks_diff(utime.ticks_us(), start)
+
+
+def run():
+    """!@brief      Runs all the tests and prints the time per step of each.
+    """
+    results = [
+        ('generator, direct', time_raw_gen()),
+        ('table, direct', time_raw_table()),
+        ('generator task', time_task(cotask.Task(gen_fun, name='Gen'))),
+        ('state table task',
+         time_task(cotask.StateTask(Steps().table(), name='Table'))),
+        ('generator task, profiled',
+         time_task(cotask.Task(gen_fun, name='Gen', profile=True))),
+        ('state table task, profiled',
+         time_task(cotask.StateTask(Steps().table(), name='Table',
+                                    profile=True))),
+        ]
+    print('DISPATCH                      US PER STEP')
+    for label, took in results:
+        print('{:<28s}{:12.3f}'.format(label, took / STEPS))
+
+
+run()
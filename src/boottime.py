@@ -0,0 +1,64 @@
+"""!@file boottime.py
+@brief      Measures how long each part of starting up takes.
+@details    Contains functions which mark points in the start-up of a program
+            and report how long it took to reach each one. The times are read
+            from @c utime.ticks_us(), which starts counting when the board is
+            reset, so the report shows the time from reset to each mark, such
+            as the first control step. This module should be imported first so
+            that it adds as little as possible to the time it measures.
+
+            Start-up can be made faster by loading precompiled modules: each
+            module can be compiled with @c mpy-cross into a @c .mpy file which
+            is copied to the board instead of the @c .py file, or all of them
+            can be frozen into the firmware with the @c manifest.py file at
+            the top of the repository, which skips loading them from the file
+            system at all.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import utime
+
+# The labels of the marks and the times in microseconds at which they were made
+_labels = []
+_times = []
+
+
+def mark(label):
+    """!@brief          Records the time at which a point in start-up is reached.
+        @param label    A short name for the point which has been reached.
+    """
+    _times.append(utime.ticks_us())
+    _labels.append(label)
+
+
+def measure(label, fun, *args, **kwargs):
+    """!@brief          Calls a function, such as a constructor, and marks when it's done.
+        @details        This lets the construction of each peripheral be timed:
+                        @code
+                        my_motor = boottime.measure("motor 1", MotorDriver, ...)
+                        @endcode
+        @param label    A short name for the call.
+        @param fun      The function to be called.
+        @return         Whatever the function returned.
+    """
+    result = fun(*args, **kwargs)
+    mark(label)
+    return result
+
+
+def report():
+    """!@brief          Creates a breakdown of the time taken to reach each mark.
+        @return         A string with a line for each mark, showing the time since
+                        reset and the time since the previous mark, in
+                        milliseconds.
+    """
+    lines = ['BOOT STEP             SINCE RESET   STEP TIME']
+    prev = 0
+    for label, time in zip(_labels, _times):
+        lines.append('{:<20s}{:12.3f}{:12.3f}'.format(label, time / 1000,
+                     utime.ticks_diff(time, prev) / 1000))
+        prev = time
+    return '\n'.join(lines)
@@ -0,0 +1,151 @@
+"""!@file coasync.py
+@brief      Runs cotask tasks on a uasyncio or asyncio event loop.
+@details    Lets the tasks in a @c cotask.TaskList share the processor with
+            drivers written for @c uasyncio, such as serial telemetry or a
+            network stack, instead of being run by a loop which calls
+            @c pri_sched() over and over. Each task is run by its own
+            coroutine, which sleeps until the task's next release time and
+            then calls the task's @c schedule() method, so the tasks' profiling,
+            tracing and budget checks work as they do with the usual
+            schedulers. Tasks which aren't run by a timer are checked for a
+            call to @c go() every @c poll_ms milliseconds.
+
+            Priorities are kept as @c pri_sched() keeps them: before a task
+            runs, its coroutine checks whether any task of higher priority is
+            due or has been told to go, and if so yields to the event loop
+            until that task has run. Each coroutine yields at least once each
+            time its task runs, even when the task is late, so a task which
+            can't keep up with its period doesn't stop the event loop. Other
+            coroutines on the loop aren't cotask tasks and have no priority,
+            so a long-running one can still delay any task.
+
+            The same code runs on the board with @c uasyncio and on a computer
+            with @c asyncio and the host stand-ins.
+
+            Example:
+            @code
+            async def main():
+                coasync.start(cotask.task_list)
+                await telemetry_coroutine()
+
+            asyncio.run(main())
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import utime
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+
+async def sleep_us(us):
+    """!@brief          Sleeps for at least a number of microseconds.
+        @details        The time is rounded up to whole milliseconds, since
+                        @c uasyncio only sleeps for whole milliseconds.
+        @param us       The time to sleep in microseconds.
+    """
+    ms = (us + 999) // 1000
+    try:
+        await asyncio.sleep_ms(ms)
+    except AttributeError:
+        await asyncio.sleep(ms / 1000)
+
+
+def _waiting(tasks):
+    """!@brief          Checks whether any of some tasks is waiting to run.
+        @param tasks    The tasks to check.
+        @return         True if a timed task's release time has passed or an
+                        untimed task's @c go() method has been called.
+    """
+    now = utime.ticks_us()
+    for task in tasks:
+        if task.go_flag:
+            return True
+        if task.period is not None \
+                and utime.ticks_diff(now, task._next_run) > 0:
+            return True
+    return False
+
+
+async def run_task(task, poll_ms=1, higher=()):
+    """!@brief          Runs one task each time it's released, forever.
+        @param task     The @c cotask.Task to run.
+        @param poll_ms  How often, in milliseconds, a task without a period is
+                        checked for a call to its @c go() method.
+        @param higher   The tasks of higher priority, which are let run first
+                        whenever they are waiting.
+    """
+    while True:
+        if task.period is not None:
+            wait = utime.ticks_diff(task._next_run, utime.ticks_us())
+            if wait >= 0:
+                await sleep_us(wait + 1)
+            else:
+                # The task is late; let the rest of the loop run first
+                await asyncio.sleep(0)
+        elif task.go_flag:
+            await asyncio.sleep(0)
+        else:
+            await sleep_us(poll_ms * 1000)
+            continue
+        while _waiting(higher):
+            await asyncio.sleep(0)
+        task.schedule()
+
+
+def start(task_list, poll_ms=1):
+    """!@brief              Starts a coroutine for each task in a task list.
+        @details            This must be called from a coroutine running on
+                            the event loop. Tasks which run on a timer start
+                            from the release times they already have.
+        @param task_list    The @c cotask.TaskList whose tasks are run.
+        @param poll_ms      How often, in milliseconds, tasks without a period
+                            are checked for a call to @c go().
+        @return             A list of the event loop's tasks, one for each of
+                            the task list's tasks, highest priority first.
+    """
+    tasks = sorted(task_list.tasks, key=lambda task: -task.priority)
+    return [asyncio.create_task(run_task(task, poll_ms, tuple(
+                other for other in tasks if other.priority > task.priority)))
+            for task in tasks]
+
+
+async def run(task_list, poll_ms=1):
+    """!@brief              Runs all the tasks in a task list until cancelled.
+        @param task_list    The @c cotask.TaskList whose tasks are run.
+        @param poll_ms      How often, in milliseconds, tasks without a period
+                            are checked for a call to @c go().
+    """
+    await asyncio.gather(*start(task_list, poll_ms))
+
+
+async def get(queue, poll_ms=1):
+    """!@brief          Waits until a queue has an item, then gets it.
+        @details        Other coroutines run while waiting, unlike
+                        @c Queue.get(), which blocks when the queue is empty.
+        @param queue    The @c task_share.Queue to read.
+        @param poll_ms  How often, in milliseconds, the queue is checked.
+        @return         The item taken from the queue.
+    """
+    while not queue.any():
+        await sleep_us(poll_ms * 1000)
+    return queue.get()
+
+
+async def put(queue, item, poll_ms=1):
+    """!@brief          Waits until a queue has room, then puts an item into it.
+        @details        Other coroutines run while waiting, unlike
+                        @c Queue.put(), which blocks when the queue is full.
+        @param queue    The @c task_share.Queue to write.
+        @param item     The item to put into the queue.
+        @param poll_ms  How often, in milliseconds, the queue is checked.
+    """
+    while queue.full():
+        await sleep_us(poll_ms * 1000)
+    queue.put(item)
@@ -11,10 +11,7 @@
 @date       February 7, 2023
 """
 
-# Import necessary modules for the testing section.
-from motor_driver import MotorDriver
-from encoder_reader import encoder
-import utime, pyb
+import array, math
 
 class CLController:
     """!@brief      Implements a controller class to be used in lab.
@@ -60,8 +57,268 @@ class CLController:
             @param  Setpoint  The controller's setpoint.
         """
         self.Setpoint = Setpoint
+
+
+class GSController(CLController):
+    """!@brief      Implements a gain-scheduled controller.
+       @details     The proportional gain is picked from a precomputed table
+                    according to how large the error is, so that a motor can
+                    be driven hard when it is far from the setpoint and gently
+                    as it gets close. The error is split into regions by a
+                    bit shift and the region number indexes the table, so no
+                    comparisons against breakpoints are needed. An optional
+                    output map made by @c output_map() can then compensate
+                    for the motor's deadband and friction with one more table
+                    lookup. Measurements and setpoints must be integers, such
+                    as encoder ticks.
+    """
+    
+    def __init__(self, gains, Setpoint, shift=10, out_map=None):
+        """!@brief             Initializes a gain-scheduled controller object.
+            @param   gains     A sequence of proportional gains. The gain at
+                               index n is used when the magnitude of the error
+                               shifted right by @c shift bits is n; the last
+                               gain is used for all larger errors.
+            @param   Setpoint  The controller's setpoint.
+            @param   shift     The number of bits by which the error is shifted
+                               to find its region, so each region is 2**shift
+                               ticks wide.
+            @param   out_map   An output map made by @c output_map(), or None.
+        """
+        super().__init__(gains[0], Setpoint)
+        ## The table of proportional gains, indexed by error region.
+        self.gains = array.array('f', gains)
+        ## The number of bits the error is shifted to find its region.
+        self.shift = shift
+        ## The output map applied to the actuation signal, or None.
+        self.out_map = out_map
+        # The index of the last region in the gain table
+        self._last = len(gains) - 1
+    
+    def run(self, Actual):
+        """!@brief		    Calculates the actuation signal using the gain for
+                            the current error region.
+            @param  Actual  The actual, measured reading from a device.
+            @return         The actuation signal necessary to drive the measured
+                            signal towards the setpoint.
+        """
+        error = self.Setpoint - Actual
+        region = abs(error) >> self.shift
+        if region > self._last:
+            region = self._last
+        self.Kp = self.gains[region]
+        Actuation = self.Kp * error
+        
+        # Look the signal up in the output map, which covers -100 to 100
+        if self.out_map is not None:
+            if Actuation > 100:
+                Actuation = 100
+            elif Actuation < -100:
+                Actuation = -100
+            Actuation = self.out_map[int(Actuation) + 100]
+        return Actuation
+
+
+class PIDController(CLController):
+    """!@brief      Implements a discrete-time PID controller which knows its period.
+       @details     The gains are given for continuous time and are turned into
+                    per-sample coefficients for the task's period, using either
+                    the Tustin (trapezoidal) or the zero-order hold
+                    discretization. If the time since the last sample is passed
+                    to @c run(), such as from the task's @c dt member, the
+                    coefficients are worked out again whenever it differs from
+                    the period they were made for by more than a sixteenth, so
+                    late or stretched releases are compensated for. The
+                    derivative is filtered with a time constant of Kd/(N*Kp),
+                    and the integral stops growing while the output is
+                    saturated.
+    """
+    
+    def __init__(self, Kp, Ki, Kd, Setpoint, period, method='tustin', N=10,
+                 limit=100):
+        """!@brief             Initializes a PID controller object.
+            @param   Kp        The controller's proportional gain.
+            @param   Ki        The integral gain, per second.
+            @param   Kd        The derivative gain, in seconds.
+            @param   Setpoint  The controller's setpoint.
+            @param   period    The nominal time in milliseconds between samples.
+            @param   method    Either 'tustin' or 'zoh', the discretization used.
+            @param   N         The derivative filter's bandwidth as a multiple
+                               of Kp/Kd.
+            @param   limit     The largest magnitude of the actuation signal.
+        """
+        super().__init__(Kp, Setpoint)
+        ## The integral gain, per second.
+        self.Ki = Ki
+        ## The derivative gain, in seconds.
+        self.Kd = Kd
+        ## The discretization used, either 'tustin' or 'zoh'.
+        self.method = method
+        ## The derivative filter's bandwidth as a multiple of Kp/Kd.
+        self.N = N
+        ## The largest magnitude of the actuation signal.
+        self.limit = limit
+        self.set_period(period)
+        self.reset()
+    
+    def set_period(self, period):
+        """!@brief		    Works out the per-sample coefficients for a period.
+            @param  period  The time in milliseconds between samples, which
+                            must be more than zero.
+        """
+        if period <= 0:
+            raise ValueError("PID period must be more than zero")
+        T = period / 1000
+        # The sample time in microseconds the coefficients are made for
+        self._dt = int(period * 1000)
+        if self.Kd and self.Kp:
+            Tf = self.Kd / (self.N * self.Kp)
+        else:
+            Tf = T
+        if self.method == 'zoh':
+            a = math.exp(-T / Tf)
+            self._ci = (0, self.Ki * T)
+            self._cd = (a, self.Kd / Tf)
+        else:
+            self._ci = (self.Ki * T / 2, self.Ki * T / 2)
+            self._cd = ((2 * Tf - T) / (2 * Tf + T), 2 * self.Kd / (2 * Tf + T))
+    
+    def run(self, Actual, dt=None):
+        """!@brief		    Calculates the actuation signal for one sample.
+            @param  Actual  The actual, measured reading from a device.
+            @param  dt      The time in microseconds since the last sample, or
+                            None to assume the nominal period. A time of zero
+                            or less, which a task's @c dt can be on a release
+                            which catches up after a late one, keeps the
+                            coefficients used last.
+            @return         The actuation signal necessary to drive the measured
+                            signal towards the setpoint.
+        """
+        if dt is not None and dt > 0 and abs(dt - self._dt) > self._dt >> 4:
+            self.set_period(dt / 1000)
+        error = self.Setpoint - Actual
+        if self._prev_error is None:
+            self._prev_error = error
+        self._deriv = self._cd[0] * self._deriv \
+            + self._cd[1] * (error - self._prev_error)
+        integral = self._integral + self._ci[0] * error \
+            + self._ci[1] * self._prev_error
+        self._prev_error = error
+        Actuation = self.Kp * error + integral + self._deriv
+        
+        # Only keep the new integral if the output isn't saturated
+        if Actuation > self.limit:
+            Actuation = self.limit
+        elif Actuation < -self.limit:
+            Actuation = -self.limit
+        else:
+            self._integral = integral
+        return Actuation
+    
+    def reset(self):
+        """!@brief		Clears the integral and derivative terms.
+        """
+        # Integral and filtered derivative terms, and the last error, which
+        # is None until the first sample so the derivative doesn't kick
+        self._integral = 0
+        self._deriv = 0
+        self._prev_error = None
+
+
+class QController(CLController):
+    """!@brief      Implements a proportional controller using only integers.
+       @details     The gain is kept as a fixed-point integer with @c shift
+                    fractional bits, so the actuation signal is found with one
+                    integer multiply and a shift. The error is clamped to the
+                    size at which the output saturates, which keeps the
+                    product small enough to be a MicroPython small integer, so
+                    no memory is allocated on each step. Measurements and
+                    setpoints must be integers, such as encoder ticks, and
+                    the actuation signal is an integer in the output's own
+                    units, such as the timer compare counts taken by
+                    @c MotorDriver.set_duty_raw().
+    """
+
+    def __init__(self, Kp, Setpoint, limit, shift=16):
+        """!@brief             Initializes a fixed-point controller object.
+            @param   Kp        The proportional gain, in output units per
+                               tick. It is converted to fixed point once.
+            @param   Setpoint  The controller's setpoint.
+            @param   limit     The largest magnitude of the actuation signal,
+                               such as a motor's @c full_scale.
+            @param   shift     The number of fractional bits in the gain.
+        """
+        if limit << shift >= 1 << 30:
+            raise ValueError("limit << shift must be less than 2**30")
+        ## The largest magnitude of the actuation signal.
+        self.limit = limit
+        ## The number of fractional bits in the fixed-point gain.
+        self.shift = shift
+        super().__init__(Kp, Setpoint)
+        self.set_Kp(Kp)
+
+    def run(self, Actual):
+        """!@brief		    Calculates the actuation signal with integer arithmetic.
+            @param  Actual  The actual, measured reading from a device.
+            @return         The actuation signal, an integer from -limit to limit.
+        """
+        error = self.Setpoint - Actual
+        if error > self._max_error:
+            error = self._max_error
+        elif error < -self._max_error:
+            error = -self._max_error
+        Actuation = (self.Kq * error) >> self.shift
+        if Actuation > self.limit:
+            Actuation = self.limit
+        elif Actuation < -self.limit:
+            Actuation = -self.limit
+        return Actuation
+
+    def set_Kp(self, Kp):
+        """!@brief		Sets the controller's proportional gain value.
+            @param  Kp  The proportional gain, in output units per tick.
+        """
+        self.Kp = Kp
+        ## The gain in fixed point, with @c shift fractional bits.
+        self.Kq = int(round(Kp * (1 << self.shift)))
+        # The error beyond which the output is saturated anyway
+        if self.Kq:
+            self._max_error = (self.limit << self.shift) // abs(self.Kq) + 1
+        else:
+            self._max_error = 0
+
+
+def output_map(deadband=0, friction=0):
+    """!@brief              Builds an output map for a gain-scheduled controller.
+        @details            The map converts an actuation signal from -100 to
+                            100 into a duty cycle. Any nonzero signal is moved
+                            out past the motor's deadband, and a friction
+                            feed-forward is added in the direction of the
+                            signal, with the result limited to 100%.
+        @param  deadband    The duty cycle in percent below which the motor
+                            doesn't move.
+        @param  friction    The duty cycle in percent added to overcome friction.
+        @return             An array of 201 duty cycles, indexed by the integer
+                            actuation signal plus 100.
+    """
+    table = array.array('f', bytes(201 * 4))
+    for idx in range(201):
+        signal = idx - 100
+        if signal != 0:
+            duty = deadband + friction + abs(signal) * (100 - deadband) / 100
+            if duty > 100:
+                duty = 100
+            table[idx] = duty if signal > 0 else -duty
+    return table
+
         
 if __name__ == "__main__":
+    # Import the modules needed only by this test, so that importing the
+    # controller doesn't load them
+    from motor_driver import MotorDriver
+    from encoder_reader import encoder
+    import utime, pyb
+    
     # Set up motor, encoder, and controller objects
     my_motor = MotorDriver(pyb.Pin.board.PA10, pyb.Pin.board.PB4, pyb.Pin.board.PB5, 3)
     my_encoder = encoder(pyb.Pin.board.PC6, pyb.Pin.board.PC7, 8)
@@ -0,0 +1,274 @@
+"""!@file cosync.py
+@brief      Links the schedulers of several boards over serial ports.
+@details    Contains the "CoSync" class, which lets cotask schedulers on
+            separate boards work together over a UART. One board is the
+            leader; each follower keeps track of the offset between its clock
+            and the leader's by timing ping messages, keeps the offset from
+            the ping with the shortest round trip in each round, and keeps its
+            frames lined up with the leader's as the clocks drift. Shares can
+            be mirrored, so a value put into a share on one board is sent to
+            the matching share on the other each time the sync task runs,
+            which bounds the delay by the sync task's period plus the time to
+            send the message. The leader can start the aligned task lists of
+            all boards at the same moment, so multi-axis moves start and
+            sample in lockstep.
+
+            Messages are framed as a sync byte, a message type, a payload
+            length, the payload and a checksum byte. All buffers are
+            allocated when the object is made.
+
+            Example, on the leader (the follower is the same but with
+            @c leader=False and no call to @c start()):
+            @code
+            link = CoSync(pyb.UART(3, 115200), cotask.task_list, leader=True)
+            link.mirror(position_share, 0)
+            cotask.task_list.append(cotask.Task(link.run, name="Sync",
+                                                priority=3, period=5))
+            # ... once the follower has synced
+            link.start(100)
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import struct, utime
+
+## The byte which begins every message.
+SYNC = 0xA5
+## A follower's request for the leader's time.
+PING = 1
+## The leader's answer to a ping.
+PONG = 2
+## A new value for a mirrored share.
+SHARE = 3
+## The leader's command to start the task lists at a given time.
+START = 4
+
+
+class CoSync:
+    """!@brief      Synchronizes clocks, shares and task lists across a serial link.
+    """
+
+    def __init__(self, link, task_list, leader=False, pings=8, ping_every=10,
+                 clock=utime.ticks_us):
+        """!@brief              Initializes one end of a link.
+            @param link         A stream with @c any(), @c readinto() and
+                                @c write() methods, such as a @c pyb.UART.
+            @param task_list    The task list started by @c start().
+            @param leader       True on the board whose clock the others follow.
+            @param pings        The number of pings in each round; the offset
+                                is updated at the end of each round.
+            @param ping_every   The number of runs of the sync task between
+                                pings, so that pings don't fill up the link.
+            @param clock        The function giving the time in microseconds,
+                                which is only changed for simulations.
+        """
+        ## The stream which carries messages to and from the other board.
+        self.link = link
+        ## The task list started by the leader's @c start().
+        self.task_list = task_list
+        ## True on the board whose clock the others follow.
+        self.leader = leader
+        ## The number of pings in each round.
+        self.pings = pings
+        ## The number of runs of the sync task between pings.
+        self.ping_every = ping_every
+        ## The function giving the time in microseconds.
+        self.clock = clock
+        ## The leader's clock minus this board's clock, in microseconds.
+        self.offset = 0
+        ## The shortest round trip time in the last round, in microseconds.
+        self.rtt = None
+        ## True once at least one round of pings has finished.
+        self.synced = leader
+        ## True once the task list has been started.
+        self.started = False
+        ## The number of messages thrown away because of bad checksums.
+        self.errors = 0
+
+        # The shares being mirrored and the values last sent for them
+        self._mirrors = []
+        self._sent = []
+        # Buffers for sending, receiving and the message being received
+        self._tx = bytearray(32)
+        self._rx = bytearray(32)
+        self._msg = bytearray(32)
+        self._rx_state = 0
+        self._rx_len = 0
+        self._rx_idx = 0
+        self._rx_sum = 0
+        # The best ping in the current round
+        self._round = 0
+        self._best_rtt = 0
+        self._best_offset = 0
+
+    def mirror(self, share, number):
+        """!@brief          Mirrors a share with the share of the same number on
+                            the other board.
+            @details        Numbers must match on both boards, and mirrored
+                            shares must have the same type code.
+            @param share    The share to be mirrored.
+            @param number   A number from 0 to 255 identifying the share.
+        """
+        while len(self._mirrors) <= number:
+            self._mirrors.append(None)
+            self._sent.append(None)
+        self._mirrors[number] = share
+
+    def leader_time(self):
+        """!@brief      Gets the time on the leader's clock.
+            @return     The leader's @c ticks_us() time, as best it is known.
+        """
+        return utime.ticks_add(self.clock(), self.offset)
+
+    def start(self, delay):
+        """!@brief          Starts the task lists on all boards together.
+            @details        Only the leader calls this. The task list on each
+                            board is aligned so that its first major frame
+                            begins at the same moment, a given time from now.
+            @param delay    The time in milliseconds from now until the start,
+                            which must be long enough for the message to
+                            reach the other boards.
+        """
+        when = utime.ticks_add(self.clock(), int(delay * 1000))
+        self._send(START, '<I', when)
+        self._start_at(when)
+
+    def run(self):
+        """!@brief      A generator which handles the link each time it's run.
+            @details    Pass this method to @c cotask.Task. Each run handles
+                        the messages which have arrived, sends a ping every
+                        so often if this board is a follower, and sends any
+                        mirrored shares whose values have changed.
+        """
+        runs = 0
+        while True:
+            self._receive()
+            if not self.leader:
+                runs += 1
+                if runs >= self.ping_every:
+                    runs = 0
+                    self._send(PING, '<I', self.clock())
+            for number in range(len(self._mirrors)):
+                share = self._mirrors[number]
+                if share is not None:
+                    value = share.get()
+                    if value != self._sent[number]:
+                        self._sent[number] = value
+                        self._send(SHARE, '<B' + share._type_code, number,
+                                   value)
+            yield 0
+
+    def _send(self, kind, fmt, *values):
+        """!@brief          Sends one message.
+            @param kind     The message type.
+            @param fmt      The @c struct format of the payload.
+            @param values   The values packed into the payload.
+        """
+        size = struct.calcsize(fmt)
+        tx = self._tx
+        tx[0] = SYNC
+        tx[1] = kind
+        tx[2] = size
+        struct.pack_into(fmt, tx, 3, *values)
+        total = 0
+        for idx in range(3, 3 + size):
+            total += tx[idx]
+        tx[3 + size] = total & 0xFF
+        self.link.write(memoryview(tx)[:4 + size])
+
+    def _receive(self):
+        """!@brief      Reads whatever has arrived and handles complete messages.
+        """
+        while self.link.any():
+            count = self.link.readinto(self._rx)
+            if not count:
+                return
+            now = self.clock()
+            for idx in range(count):
+                byte = self._rx[idx]
+                state = self._rx_state
+                if state == 0:
+                    if byte == SYNC:
+                        self._rx_state = 1
+                elif state == 1:
+                    self._msg[0] = byte
+                    self._rx_state = 2
+                elif state == 2:
+                    if byte > len(self._msg) - 1:
+                        self._rx_state = 0
+                    else:
+                        self._rx_len = byte
+                        self._rx_idx = 0
+                        self._rx_sum = 0
+                        self._rx_state = 3 if byte else 4
+                elif state == 3:
+                    self._msg[1 + self._rx_idx] = byte
+                    self._rx_sum += byte
+                    self._rx_idx += 1
+                    if self._rx_idx >= self._rx_len:
+                        self._rx_state = 4
+                else:
+                    self._rx_state = 0
+                    if byte == self._rx_sum & 0xFF:
+                        self._handle(now)
+                    else:
+                        self.errors += 1
+
+    def _handle(self, now):
+        """!@brief          Acts on a complete message.
+            @param now      The time at which the message was read.
+        """
+        kind = self._msg[0]
+        if kind == PING:
+            t0 = struct.unpack_from('<I', self._msg, 1)[0]
+            self._send(PONG, '<III', t0, now, self.clock())
+        elif kind == PONG:
+            t0, t1, t2 = struct.unpack_from('<III', self._msg, 1)
+            rtt = utime.ticks_diff(now, t0) - utime.ticks_diff(t2, t1)
+            offset = (utime.ticks_diff(t1, t0) + utime.ticks_diff(t2, now)) // 2
+            if self._round == 0 or rtt < self._best_rtt:
+                self._best_rtt = rtt
+                self._best_offset = offset
+            self._round += 1
+            if self._round >= self.pings:
+                self._end_round()
+        elif kind == SHARE:
+            number = self._msg[1]
+            if number < len(self._mirrors) and self._mirrors[number] is not None:
+                share = self._mirrors[number]
+                value = struct.unpack_from('<' + share._type_code, self._msg,
+                                           2)[0]
+                # Remember the value so it isn't sent straight back
+                self._sent[number] = value
+                share.put(value)
+        elif kind == START:
+            when = struct.unpack_from('<I', self._msg, 1)[0]
+            self._start_at(utime.ticks_add(when, -self.offset))
+
+    def _end_round(self):
+        """!@brief      Updates the clock offset with the best ping of a round.
+            @details    If the task list has been started, its releases are
+                        moved to follow the change in offset so its frames
+                        stay lined up with the leader's.
+        """
+        change = self._best_offset - self.offset
+        self.offset = self._best_offset
+        self.rtt = self._best_rtt
+        self._round = 0
+        if self.started and self.synced:
+            self.task_list.shift(-change)
+        self.synced = True
+
+    def _start_at(self, when):
+        """!@brief          Aligns the task list to start at a time on this board.
+            @param when     The start time on this board's clock.
+        """
+        # Convert from the sync clock to the scheduler's clock, in case they
+        # differ, as they do in simulations
+        when = utime.ticks_add(when, -utime.ticks_diff(self.clock(),
+                                                       utime.ticks_us()))
+        self.task_list.align(start=when)
+        self.started = True
@@ -30,9 +30,23 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import gc                              # Memory allocation garbage collector
 import utime                           # Micropython version of time library
+import pyb                             # Used to turn interrupts off briefly
 import micropython                     # This shuts up incorrect warnings
 
 
+## The number of task priority levels, 0 to 29. The ready bitmap of a task
+#  list has one bit for each level, which keeps it a small integer on the
+#  board so that setting bits in interrupts doesn't allocate memory
+PRI_LEVELS = 30
+
+# A table of the number of the highest set bit in each byte, used to find the
+# highest priority level which is ready. MicroPython integers have no
+# bit_length(), and a table lookup takes about the same time at any priority
+_MSB = bytearray(256)
+for _i in range(2, 256):
+    _MSB[_i] = _MSB[_i >> 1] + 1
+
+
 class Task:
     """!
     Implements multitasking with scheduling and some performance logging.
@@ -70,7 +84,8 @@ class Task:
 
 
     def __init__(self, run_fun, name="NoName", priority=0, period=None,
-                 profile=False, trace=False, shares=()):
+                 profile=False, trace=False, shares=(), phase=0,
+                 budget=None, on_overrun=None, overrun_limit=3):
         """!
         Initialize a task object so it may be run by the scheduler.
 
@@ -78,10 +93,11 @@ class Task:
         parameters and preparing an empty dictionary for states.
         
         @param run_fun The function which implements the task's code. It must
-               be a generator which yields the current state.
+               be a generator which yields the current state. It is @c None
+               for a task such as a @c StateTask which doesn't use one.
         @param name The name of the task, by default @c NoName. This should
                be overridden with a more descriptive name by the programmer.
-        @param priority The priority of the task, a positive integer with
+        @param priority The priority of the task, an integer from 0 to 29 with
                higher numbers meaning higher priority (default 0)
         @param period The time in milliseconds between runs of the task if it's
                run by a timer or @c None if the task is not run by a timer.
@@ -92,15 +108,31 @@ class Task:
                states. @b Note: This slows things down and allocates memory.
         @param shares A list or tuple of shares and queues used by this task.
                If no list is given, no shares are passed to the task
+        @param phase The offset in milliseconds of the task's releases from
+               the start of each major frame, used only when the task list
+               is aligned by @c TaskList.align() (default 0)
+        @param budget The longest time in milliseconds which one run of the
+               task should take, or @c None (the default) for no budget
+        @param on_overrun A function called with the task as its parameter
+               each time a run takes longer than the budget, or @c None
+        @param overrun_limit The number of overruns in a row after which the
+               task's next release is skipped (default 3)
         """
         # The function which is run to implement this task's code. Since it 
         # is a generator, we "run" it here, which doesn't actually run it but
         # gets it going as a generator which is ready to yield values
-        if shares:
+        if run_fun is None:
+            self._run_gen = None
+        elif shares:
             self._run_gen = run_fun(shares)
         else:
             self._run_gen = run_fun()
 
+        # The table of step functions run instead of the generator, if any;
+        # it is set by @c StateTask
+        self._table = None
+        self._state = 0
+
         ## The name of the task, hopefully a short and descriptive string.
         self.name = name
 
@@ -120,6 +152,37 @@ class Task:
             self.period = period
             self._next_run = None
 
+        ## The offset, in microseconds, of this task's releases from the start
+        #  of each major frame when the task list has been aligned with
+        #  @c TaskList.align(). 
+        self.phase = int(phase * 1000)
+
+        ## The execution time budget in microseconds for each run of the task,
+        #  or @c None if the run time isn't being checked against a budget
+        self.budget = int(budget * 1000) if budget else None
+
+        ## A function called with this task as its parameter whenever a run
+        #  of the task overruns its budget; it may be used as a watchdog hook
+        self.on_overrun = on_overrun
+
+        ## The number of consecutive overruns after which a timed task skips
+        #  its next release
+        self.overrun_limit = overrun_limit
+
+        ## The number of runs which have taken longer than the budget
+        self.overruns = 0
+
+        # The number of overruns in a row
+        self._overrun_run = 0
+
+        ## The time in microseconds between the task's last two releases by
+        #  its timer. It is the period corrected by the change in lateness,
+        #  for use by controllers which compensate for the actual sample time
+        self.dt = self.period
+
+        # The lateness of the task's last release
+        self._last_late = 0
+
         # Flag which causes the task to be profiled, in which the execution
         #  time of the @c run() method is measured and basic statistics kept. 
         self._prof = profile
@@ -139,6 +202,20 @@ class Task:
         #  scheduler
         self.go_flag = False
 
+        ## The number of bytes of memory allocated by the task's runs while
+        #  allocation checking is turned on by @c TaskList.freeze()
+        self.allocs = 0
+        self._alloc_check = False
+
+        ## A count of the task's runs, which wraps at 2**30 so it stays a small
+        #  integer. A supervisor watches it as the task's heartbeat
+        self.beats = 0
+
+        # The task list the task belongs to and the task's bit in that list's
+        # ready bitmap, which are set by TaskList.append()
+        self._list = None
+        self._bit = 0
+
 
     def schedule(self) -> bool:
         """!
@@ -154,17 +231,42 @@ class Task:
             # Reset the go flag for the next run
             self.go_flag = False
 
-            # If profiling, save the start time
-            if self._prof:
+            # If profiling or checking the budget, save the start time. It is
+            # taken here rather than when the task was released, so time spent
+            # running other tasks in between isn't charged to this one
+            if self._prof or self.budget:
                 stime = utime.ticks_us()
 
-            # Run the method belonging to the state which should be run next
-            curr_state = next(self._run_gen)
+            # If checking for allocation, save the amount of memory in use
+            if self._alloc_check:
+                alloc = gc.mem_alloc()
 
-            # If profiling or tracing, save timing data
-            if self._prof or self._trace:
+            # Run the method belonging to the state which should be run next
+            if self._table is None:
+                curr_state = next(self._run_gen)
+            else:
+                curr_state = self._table[self._state]()
+                self._state = curr_state
+            self.beats = (self.beats + 1) & 0x3FFFFFFF
+
+            # Any growth in memory use was allocated by the task's code. If
+            # the garbage collector ran, memory use might have shrunk instead
+            if self._alloc_check:
+                alloc = gc.mem_alloc() - alloc
+                if alloc > 0:
+                    self.allocs += alloc
+
+            # If profiling, tracing or checking the budget, save timing data
+            if self._prof or self._trace or self.budget:
                 etime = utime.ticks_us()
 
+            # If the run took longer than its budget, count an overrun
+            if self.budget:
+                if utime.ticks_diff(etime, stime) > self.budget:
+                    self._overrun()
+                else:
+                    self._overrun_run = 0
+
             # If profiling, save timing data
             if self._prof:
                 self._runs += 1
@@ -208,9 +310,12 @@ class Task:
         # If this task uses a timer, check if it's time to run run() again. If
         # so, set go flag and set the timer to go off at the next run time
         if self.period != None:
-            late = utime.ticks_diff(utime.ticks_us(), self._next_run)
+            now = utime.ticks_us()
+            late = utime.ticks_diff(now, self._next_run)
             if late > 0:
                 self.go_flag = True
+                self.dt = self.period + late - self._last_late
+                self._last_late = late
                 self._next_run = utime.ticks_diff(self.period, 
                                                   -self._next_run)
 
@@ -224,6 +329,28 @@ class Task:
         return self.go_flag
 
 
+    def _overrun(self):
+        """!
+        This method records a run which took longer than the task's budget.
+        It counts the overrun and calls the overrun hook, if there is one. If
+        the task has overrun @c overrun_limit times in a row and runs on a
+        timer, its next release is skipped so that the other tasks get the
+        processor's time back. The period isn't changed, so the task keeps
+        its phase in a list which has been aligned and later releases come
+        at their usual times.
+        """
+        self.overruns += 1
+        self._overrun_run += 1
+        if self.on_overrun:
+            self.on_overrun(self)
+        if self._overrun_run >= self.overrun_limit:
+            self._overrun_run = 0
+            if self.period != None:
+                self._next_run = utime.ticks_add(self._next_run, self.period)
+                # Count the skipped period in the next release's dt
+                self._last_late -= self.period
+
+
     def set_period(self, new_period):
         """!
         This method sets the period between runs of the task to the given
@@ -249,6 +376,28 @@ class Task:
         self._latest = 0
 
 
+    def get_stats(self, out):
+        """!
+        This method copies the task's profiling statistics into an array.
+        Nothing is allocated, so it may be used by a task which reports on
+        the scheduler while the system is running. Durations and lateness
+        are integers in microseconds; they are only kept when profiling.
+        @param out An array of at least six unsigned integers which is filled
+               with the number of runs, average and maximum duration, average
+               and maximum lateness, and number of budget overruns
+        """
+        out[0] = self._runs
+        if self._runs > 0:
+            out[1] = self._run_sum // self._runs
+            out[3] = self._late_sum // self._runs
+        else:
+            out[1] = 0
+            out[3] = 0
+        out[2] = self._slowest
+        out[4] = self._latest
+        out[5] = self.overruns
+
+
     def get_trace(self):
         """!
         This method returns a string containing the task's transition trace.
@@ -276,8 +425,15 @@ class Task:
         Method to set a flag so that this task indicates that it's ready to run.
         This method may be called from an interrupt service routine or from
         another task which has data that this task needs to process soon.
+        It also marks the task's priority level as ready in its task list.
         """
         self.go_flag = True
+        if self._list is not None:
+            # The bitmap is also changed by the scheduler, so the update must
+            # not be split by an interrupt whose handler calls go()
+            irq_state = pyb.disable_irq()
+            self._list._ready |= self._bit
+            pyb.enable_irq(irq_state)
 
 
     def __repr__(self):
@@ -302,6 +458,69 @@ class Task:
         return rst
 
 
+class StateTask(Task):
+    """!
+    A task whose states are run from a table of functions.
+
+    Rather than resuming a generator, the scheduler calls the function in a
+    table which belongs to the task's current state. Each function runs the
+    state once and returns the number of the state to run next. This saves
+    the cost of resuming a generator and of the chain of @c if statements
+    which a generator uses to find its state, so a task which runs very
+    often takes less of the processor's time. The functions are usually
+    bound methods of an object which holds the task's data. Profiling,
+    tracing, budgets and allocation checking work as they do for tasks
+    made from generators.
+
+    Example:
+      @code
+          class Blinker:
+              def __init__ (self, pin):
+                  self.pin = pin
+              def on (self):
+                  self.pin.high ()
+                  return 1
+              def off (self):
+                  self.pin.low ()
+                  return 0
+
+          blinker = Blinker (pyb.Pin (pyb.Pin.board.PA5, pyb.Pin.OUT_PP))
+          task = cotask.StateTask ([blinker.on, blinker.off], name = 'Blink',
+                                   priority = 1, period = 500)
+          cotask.task_list.append (task)
+      @endcode
+    """
+
+    def __init__(self, table, state=0, **kwargs):
+        """!
+        Initialize a task which runs the functions in a state table.
+        @param table A list or tuple of functions taking no parameters, one
+               for each state, indexed by state number. Each returns the
+               number of the next state to run.
+        @param state The number of the state run first (default 0)
+        @param kwargs The name, priority, period and other parameters, as for
+               @c Task; @c shares are not used
+        """
+        super().__init__(None, **kwargs)
+        self._table = table
+        self._state = state
+        self._prev_state = state
+
+
+# =============================================================================
+
+def _gcd(a, b):
+    """!
+    Find the greatest common divisor of two non-negative integers.
+    @param a The first integer
+    @param b The second integer
+    @return The greatest common divisor of @c a and @c b
+    """
+    while b:
+        a, b = b, a % b
+    return a
+
+
 # =============================================================================
 
 class TaskList:
@@ -313,49 +532,137 @@ class TaskList:
     use of the task list is given in the last few lines of the documentation
     for class @c Task. 
 
-    The task list is sorted by priority so that the scheduler can efficiently
-    look through the list to find the highest priority task which is ready to
-    run at any given time. Tasks can also be scheduled in a simpler
-    "round-robin" fashion.
+    Tasks are kept in a list for each priority level, and a bitmap holds one
+    bit for each level at which a task may be ready to run, so the scheduler
+    can find the highest priority task which is ready to run at any given
+    time without looking through the levels which have nothing to do. Tasks
+    can also be scheduled in a simpler "round-robin" fashion.
+
+    Besides the main @c task_list, any number of task lists may be created,
+    each with its own scheduling policy which is used by @c sched(). A task
+    list can be run as one task in another list, so that for example a fast
+    motor control list uses priority scheduling while a slow housekeeping
+    list, run as a single low priority task, uses round-robin scheduling:
+      @code
+          motors = cotask.TaskList ('pri')
+          housekeeping = cotask.TaskList ('rr')
+          # ... append tasks to each list
+          motors.append (housekeeping.as_task (name = 'Housekeeping',
+                                               priority = 0, period = 100))
+          while True:
+              motors.sched ()
+      @endcode
     """
 
-    def __init__(self):
+    def __init__(self, policy='pri'):
         """!
         Initialize the task list. This creates the list of priorities in
         which tasks will be organized by priority.
+        @param policy The scheduling policy used by @c sched(): @c 'pri' for
+               @c pri_sched(), @c 'rr' for @c rr_sched() or @c 'frame' for
+               @c frame_sched() (default @c 'pri')
         """
-        ## The list of priority lists. Each priority for which at least one 
-        #  task has been created has a list whose first element is a task 
-        #  priority and whose other elements are references to task objects at
-        #  that priority. 
-        self.pri_list = []
+        if policy not in ('pri', 'rr', 'frame'):
+            raise ValueError("Unknown scheduling policy " + str(policy))
+
+        ## The scheduling policy used by @c sched()
+        self.policy = policy
+
+        ## The list of priority levels, indexed by priority. Each level for
+        #  which at least one task has been added has a list whose first
+        #  element is the index of the next task at that level to be run
+        #  (used for round-robin scheduling of those tasks) and whose other
+        #  elements are references to task objects at that priority; levels
+        #  without tasks are @c None.
+        self.levels = [None] * PRI_LEVELS
+
+        # The ready bitmap, with bit N set when a task at priority N may be
+        # ready to run; the tasks which run on timers; the time at which the
+        # next of those is due, before which they aren't checked; and the
+        # tasks which don't run on timers, which are asked on every pass
+        self._ready = 0
+        self._timed = []
+        self._due = utime.ticks_us()
+        self._untimed = []
+
+        ## A flat list of all the tasks in the order in which they were added
+        self.tasks = []
+
+        ## The minor frame (base tick) in microseconds, or @c None if the
+        #  task list has not been aligned with @c align()
+        self.minor_frame = None
+
+        ## The major frame in microseconds, after which the pattern of task
+        #  releases repeats, or @c None if the list has not been aligned
+        self.major_frame = None
+
+        ## A tuple holding, for each minor frame slot in the major frame, a
+        #  tuple of the tasks released in that slot in priority order
+        self.frame_table = ()
+
+        # The index of the next slot to be run and the time at which it starts
+        self._slot = 0
+        self._frame_next = 0
+
+        ## Flag which is set true by @c freeze() when setup is finished and
+        #  no more tasks may be added
+        self.frozen = False
+
+        # The longest time taken by a garbage collection in idle time, used
+        # to judge whether an idle gap is long enough for another one, and
+        # the memory in use just after the last collection
+        self._gc_time = 0
+        self._gc_floor = 0
+
+        # The untimed task made by as_task() which runs this list, if any
+        self._parent_task = None
 
 
     def append(self, task):
         """!
-        Append a task to the task list. The list will be sorted by task 
-        priorities so that the scheduler can quickly find the highest priority
-        task which is ready to run at any given time. 
+        Append a task to the task list. The task is added to the list for its
+        priority level, so that the scheduler can quickly find the highest
+        priority task which is ready to run at any given time. 
         @param task The task to be appended to the list
         """
-        # See if there's a tasklist with the given priority in the main list
+        if self.frozen:
+            raise RuntimeError("Can't add a task to a frozen task list")
         new_pri = task.priority
-        for pri in self.pri_list:
-            # If a tasklist with this priority exists, add this task to it.
-            if pri[0] == new_pri:
-                pri.append(task)
-                break
-
-        # If the priority isn't in the list, this else clause starts a new 
-        # priority list with this task as first one. A priority list has the
-        # priority as element 0, an index into the list of tasks (used for
-        # round-robin scheduling those tasks) as the second item, and tasks
-        # after those
+        if not 0 <= new_pri < PRI_LEVELS:
+            raise ValueError(f"Task {task.name} priority must be from 0 to "
+                             f"{PRI_LEVELS - 1}")
+        self.tasks.append(task)
+
+        # Add the task to the list for its priority level, starting a new one
+        # if it's the first task at that level
+        if self.levels[new_pri] is None:
+            self.levels[new_pri] = [1, task]
         else:
-            self.pri_list.append([new_pri, 2, task])
+            self.levels[new_pri].append(task)
+
+        # Connect the task to this list's ready bitmap. A timed task makes
+        # the list check the timers straight away, as it may already be due
+        task._list = self
+        task._bit = 1 << new_pri
+        if task.period != None:
+            self._timed.append(task)
+            self._due = utime.ticks_us()
+        else:
+            self._untimed.append(task)
+        if task.go_flag:
+            self._ready |= task._bit
+
 
-        # Make sure the main list (of lists at each priority) is sorted
-        self.pri_list.sort(key=lambda pri: pri[0], reverse=True)
+    def _by_priority(self):
+        """!
+        Make a list of all the tasks, highest priority first.
+        @return A list of the tasks in the task list in order of priority
+        """
+        tasks = []
+        for pri in range(PRI_LEVELS - 1, -1, -1):
+            if self.levels[pri] is not None:
+                tasks.extend(self.levels[pri][1:])
+        return tasks
 
 
     @micropython.native
@@ -372,9 +679,11 @@ class TaskList:
         again.
         """
         # For each priority level, run all tasks at that level
-        for pri in self.pri_list:
-            for task in pri[2:]:
-                task.schedule()
+        for pri in range(PRI_LEVELS - 1, -1, -1):
+            level = self.levels[pri]
+            if level is not None:
+                for idx in range(1, len(level)):
+                    level[idx].schedule()
 
 
     @micropython.native
@@ -384,23 +693,296 @@ class TaskList:
 
         This scheduler runs tasks in a priority based fashion. Each time it is
         called, it finds the highest priority task which is ready to run and
-        calls that task's @c run() method.
+        calls that task's @c run() method. Timed tasks are only checked once
+        the earliest of them is due, and only priority levels whose bits are
+        set in the ready bitmap are looked at, so the time taken doesn't grow
+        with the number of priority levels in use. Tasks without a period are
+        asked whether they're ready on every call, so one which overrides
+        @c ready() or has its @c go_flag set directly still runs.
         """
-        # Go down the list of priorities, beginning with the highest
-        for pri in self.pri_list:
-            # Within each priority list, run tasks in round-robin order
-            # Each priority list is [priority, index, task, task, ...] where
-            # index is the index of the next task in the list to be run
-            tries = 2
-            length = len(pri)
+        # If a timed task is due, release every timed task whose time has
+        # come and find when the next one will be due
+        now = utime.ticks_us()
+        if self._timed and utime.ticks_diff(now, self._due) > 0:
+            due = None
+            for task in self._timed:
+                if task.ready():
+                    irq_state = pyb.disable_irq()
+                    self._ready |= task._bit
+                    pyb.enable_irq(irq_state)
+                wait = utime.ticks_diff(task._next_run, now)
+                if due is None or wait < due:
+                    due = wait
+            self._due = utime.ticks_add(now, due)
+
+        # A call to go() has already set an untimed task's bit, but ready()
+        # may have been overridden, so ask each task whose bit isn't set
+        for task in self._untimed:
+            if not self._ready & task._bit and task.ready():
+                irq_state = pyb.disable_irq()
+                self._ready |= task._bit
+                pyb.enable_irq(irq_state)
+
+        while self._ready:
+            # Find the highest set bit in the ready bitmap, a byte at a time
+            bits = self._ready
+            if bits >> 16:
+                if bits >> 24:
+                    pri = _MSB[bits >> 24] + 24
+                else:
+                    pri = _MSB[bits >> 16] + 16
+            elif bits >> 8:
+                pri = _MSB[bits >> 8] + 8
+            else:
+                pri = _MSB[bits]
+
+            # Within the level, run tasks in round-robin order. Each level is
+            # [index, task, task, ...] where index is the index of the next
+            # task in the list to be run
+            level = self.levels[pri]
+            tries = 1
+            length = len(level)
+            ran = False
             while tries < length:
-                ran = pri[pri[1]].schedule()
+                ran = level[level[0]].schedule()
                 tries += 1
-                pri[1] += 1
-                if pri[1] >= length:
-                    pri[1] = 2
+                level[0] += 1
+                if level[0] >= length:
+                    level[0] = 1
                 if ran:
-                    return
+                    break
+
+            # Clear the level's bit if no task there is still waiting to run.
+            # Interrupts are off so a call to go() from one isn't lost. The
+            # level is scanned by index, as a slice would allocate a new list
+            irq_state = pyb.disable_irq()
+            for idx in range(1, length):
+                if level[idx].go_flag:
+                    break
+            else:
+                self._ready &= ~(1 << pri)
+            pyb.enable_irq(irq_state)
+
+            if ran:
+                return
+
+
+    def sched(self):
+        """!
+        Run tasks using the task list's own scheduling policy.
+        """
+        if self.policy == 'pri':
+            self.pri_sched()
+        elif self.policy == 'rr':
+            self.rr_sched()
+        else:
+            self.frame_sched()
+
+
+    def as_task(self, name="TaskList", priority=0, period=None, **kwargs):
+        """!
+        Create a task which runs this task list with its own policy.
+
+        The task calls @c sched() each time it runs, so the tasks in this list
+        only run when the task is run by its parent list. A budget given for
+        the task applies to everything this list runs in one call. With the
+        default period of @c None the task calls @c go() on itself each time
+        it runs, so it is ready on every pass of the parent's scheduler;
+        under @c pri_sched() it should then have a lower priority than the
+        parent's other tasks. A parent which uses @c frame_sched() only runs
+        timed tasks, so the task needs a period there.
+        @param name The name of the task (default @c TaskList)
+        @param priority The task's priority in its parent list (default 0)
+        @param period The time in milliseconds between calls to @c sched(),
+               or @c None (the default) to call it on every pass
+        @param kwargs Other parameters, such as @c budget, as for @c Task
+        @return A @c Task which may be appended to another task list
+        """
+        task = Task(self._run, name=name, priority=priority, period=period,
+                    **kwargs)
+        if period is None:
+            self._parent_task = task
+            task.go()
+        return task
+
+
+    def _run(self):
+        """!
+        A generator which runs the task list once each time it's resumed.
+        """
+        while True:
+            self.sched()
+            # An untimed task made by as_task() stays ready for the next pass
+            if self._parent_task is not None:
+                self._parent_task.go()
+            yield 0
+
+
+    def align(self, minor=None, start=None):
+        """!
+        Align the releases of all timed tasks to a common base tick.
+
+        This method sets the task list up as a cyclic executive. The minor
+        frame is the base tick; every period and phase must be a whole number
+        of minor frames, and the periods must be harmonic (each one divides
+        every longer one) so that the pattern of releases repeats once per
+        major frame, which is the longest period. Every timed task is then
+        released at its phase offset from one common start time rather than
+        at a time computed when the task was constructed, so the releases
+        cannot drift relative to each other and phases can be chosen to keep
+        tasks out of each other's slots.
+        @param minor The minor frame in milliseconds, or @c None to use the
+               greatest common divisor of all the periods and phases
+        @param start The @c utime.ticks_us() time at which the first major
+               frame starts, or @c None to start one minor frame from now
+        @return A list of the slot numbers in which more than one task is
+               released; an empty list means no two tasks ever collide
+        """
+        timed = [task for task in self._by_priority() if task.period != None]
+        if not timed:
+            raise ValueError("No timed tasks to align")
+
+        if minor is None:
+            minor = 0
+            for task in timed:
+                minor = _gcd(_gcd(minor, task.period), task.phase)
+        else:
+            minor = int(minor * 1000)
+
+        for task in timed:
+            if task.period % minor or task.phase % minor:
+                raise ValueError(f"Task {task.name} period and phase must be "
+                                 f"multiples of the {minor} us minor frame")
+            if task.phase >= task.period:
+                raise ValueError(f"Task {task.name} phase must be less than "
+                                 "its period")
+        periods = sorted(task.period for task in timed)
+        for short, long in zip(periods, periods[1:]):
+            if long % short:
+                raise ValueError("Task periods must be harmonic")
+        major = periods[-1]
+
+        # Build the table of which tasks are released in each slot. Tasks in
+        # the timed list are already in priority order, highest first
+        table = [[] for slot in range(major // minor)]
+        for task in timed:
+            for release in range(task.phase, major, task.period):
+                table[release // minor].append(task)
+        self.frame_table = tuple(tuple(slot) for slot in table)
+        self.minor_frame = minor
+        self.major_frame = major
+
+        # Start the first major frame one minor frame from now
+        if start is None:
+            start = utime.ticks_add(utime.ticks_us(), minor)
+        for task in timed:
+            task._next_run = utime.ticks_add(start, task.phase)
+        self._slot = 0
+        self._frame_next = start
+        self._due = start
+
+        return [num for num, slot in enumerate(table) if len(slot) > 1]
+
+
+    def shift(self, delta):
+        """!
+        Move the releases of all timed tasks by a number of microseconds.
+        This is used to keep the frames of task lists on separate boards
+        lined up as their clocks drift apart.
+        @param delta The number of microseconds by which releases are delayed;
+               a negative number makes them earlier
+        """
+        for task in self.tasks:
+            if task.period != None:
+                task._next_run = utime.ticks_add(task._next_run, delta)
+        self._frame_next = utime.ticks_add(self._frame_next, delta)
+        self._due = utime.ticks_us()
+
+
+    @micropython.native
+    def frame_sched(self):
+        """!
+        Run tasks as a cyclic executive using the frame table.
+
+        Each time it is called, this scheduler checks whether the next minor
+        frame has begun; if so, it runs the tasks released in that frame's
+        slot, highest priority first, and moves on to the next slot. The task
+        list must first have been set up by @c align(). Tasks which have no
+        period are not in the frame table and are not run by this scheduler.
+        """
+        if utime.ticks_diff(utime.ticks_us(), self._frame_next) > 0:
+            for task in self.frame_table[self._slot]:
+                task.schedule()
+            self._slot += 1
+            if self._slot >= len(self.frame_table):
+                self._slot = 0
+            self._frame_next = utime.ticks_add(self._frame_next,
+                                               self.minor_frame)
+
+
+    def freeze(self, debug=False):
+        """!
+        Finish setup and keep the scheduler from allocating memory.
+
+        After this method is called no more tasks may be added, transition
+        tracing (which allocates memory) is switched off, the heap is cleaned
+        up, and automatic garbage collection is disabled so that a collection
+        can't interrupt a control step. The program should then call
+        @c idle_collect() between scheduler runs so that garbage is collected
+        only when no task is due to run soon. If @c debug is @c True, each
+        task counts the bytes allocated by its runs in its @c allocs member,
+        which should stay at zero for code that is safe to run frozen.
+        @param debug Set to @c True to check the tasks for allocation
+        """
+        for task in self.tasks:
+            task._trace = False
+            task._alloc_check = debug
+            task.allocs = 0
+        self.frozen = True
+        gc.collect()
+        self._gc_floor = gc.mem_alloc()
+        gc.disable()
+
+
+    def thaw(self):
+        """!
+        Undo @c freeze(), turning automatic garbage collection back on and
+        allowing tasks to be added again.
+        """
+        for task in self.tasks:
+            task._alloc_check = False
+        self.frozen = False
+        gc.enable()
+
+
+    def idle_collect(self, threshold=4096):
+        """!
+        Collect garbage if there's time before the next task is due.
+
+        This method finds how long it will be until the next timed task is
+        released. If more than the longest collection seen so far (plus a
+        margin of a quarter) will fit in that gap, and at least @c threshold
+        bytes have been allocated since the last collection, garbage is
+        collected. A frozen program
+        should call this method after each call to the scheduler.
+        @param threshold The amount of allocated memory in bytes below which
+               no collection is done
+        @return @c True if garbage was collected or @c False if not
+        """
+        if gc.mem_alloc() - self._gc_floor < threshold:
+            return False
+        now = utime.ticks_us()
+        for task in self.tasks:
+            if task.period != None:
+                if (utime.ticks_diff(task._next_run, now)
+                        <= self._gc_time + (self._gc_time >> 2)):
+                    return False
+        gc.collect()
+        took = utime.ticks_diff(utime.ticks_us(), now)
+        if took > self._gc_time:
+            self._gc_time = took
+        self._gc_floor = gc.mem_alloc()
+        return True
 
 
     def __repr__(self):
@@ -409,9 +991,8 @@ class TaskList:
         """
         ret_str = 'TASK             PRI    PERIOD    RUNS   AVG DUR   MAX ' \
             'DUR  AVG LATE  MAX LATE\n'
-        for pri in self.pri_list:
-            for task in pri[2:]:
-                ret_str += str(task) + '\n'
+        for task in self._by_priority():
+            ret_str += str(task) + '\n'
 
         return ret_str
 
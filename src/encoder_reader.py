@@ -3,13 +3,16 @@
 @details    Contains the "encoder" class that can be used to set up encoder objects
             that will be used in future labs. Encoders are able to sense positional
             changes, allowing for angle control or rotational speed calculations.
+            The "EncoderBank" class reads several encoders at the same moment
+            for multi-axis control.
 @author     Nathan Dodd
 @author     Lewis Kanagy
 @author     Sean Wahl
 @date       January 31, 2023
 """
 
-import time, pyb
+import array, time, pyb, utime
+import task_share
 
 class encoder:
     """!@brief       Implements an encoder class to be used in lab.
@@ -17,7 +20,7 @@ class encoder:
                     kits. Allows for functions such as reading and zeroing.
     """
     
-    def __init__(self, pin1, pin2, timer):
+    def __init__(self, pin1, pin2, timer, overflow_irq=False):
         """!@brief          Initializes an encoder object.
             @details        Using pin objects as inputs, is able to create an encoder
                             capable of sensing positional changes through the use of
@@ -25,6 +28,10 @@ class encoder:
             @param pin1     Pin object connected to encoder channel A. 
             @param pin2     Pin object connected to encoder channel B.
             @param timer    Timer channel (has to be compatible with pins 1 and 2)
+            @param overflow_irq  If True, the timer's update interrupt counts
+                            each time the 16-bit counter overflows or
+                            underflows, so the position is correct no matter
+                            how rarely the encoder is read.
         """
         ## Pin object representing the connection to channel A of the encoder.
         self.pin1 = pyb.Pin(pin1, pyb.Pin.OUT_PP)
@@ -40,21 +47,53 @@ class encoder:
         self.count = 0
         ## The previous timer count value.
         self.prev = 0
+        ## @brief    Share holding the number of times the counter has wrapped.
+        #  @details  Overflows add one and underflows subtract one. This is
+        #            @c None unless the overflow interrupt is being used.
+        self.wraps = None
+        # The extended count at which the encoder was last zeroed
+        self._offset = 0
+        if overflow_irq:
+            self.wraps = task_share.Share('l', thread_protect=False,
+                                          name='Enc' + str(timer) + ' wraps')
+            self.wraps.put(0)
+            self.timer.callback(self._on_wrap)
         
     def read_encoder(self):
         """!@brief          Retrieves the overall position of the encoder.
             @return         The total position of the encoder in ticks.
         """
+        # With the overflow interrupt, the count is the extended counter
+        if self.wraps is not None:
+            return self._update(self._extended())
+        return self._update(self.timer.counter())
+        
+    def _update(self, current, wraps=0):
+        """!@brief          Updates the position from a value read from the counter.
+            @details        This is shared by @c read_encoder() and by
+                            @c EncoderBank, which reads the counters itself.
+            @param current  The value read from the timer's counter, or with
+                            the overflow interrupt, the counter extended by
+                            the number of wraps.
+            @param wraps    The number of wraps not already included in
+                            @c current, when using the overflow interrupt.
+            @return         The total position of the encoder in ticks.
+        """
+        if self.wraps is not None:
+            self.count = self._offset - ((wraps << 16) + current)
+            return self.count
+
         ## The current timer count value.
-        self.current = self.timer.counter()
+        self.current = current
         ## The change in timer count value from the last update.
         self.delta = self.current-self.prev
-        # Check for overflow/underflow
-        if abs(self.delta) > (0xFFFF+1)/2:
+        # Check for overflow/underflow. The counter counts 0x10000 values, so
+        # a wrap changes it by that much; integers keep this free of floats
+        if abs(self.delta) > 0x8000:
             if self.delta > 0:
-                self.count -= self.delta - 0xFFFF
+                self.count -= self.delta - 0x10000
             else:
-                self.count -= self.delta + 0xFFFF
+                self.count -= self.delta + 0x10000
         else:
             self.count -= self.delta
             
@@ -66,7 +105,116 @@ class encoder:
         """
         self.count = 0
         self.prev = self.timer.counter()
-        
+        if self.wraps is not None:
+            self._offset = self._extended()
+    
+    def _extended(self):
+        """!@brief          Reads the counter extended by the number of wraps.
+            @details        The counter is read with interrupts off, so a wrap
+                            whose interrupt is pending at that moment has been
+                            counted by the time the number of wraps is read
+                            again; @c _wraps_at() then works out whether it
+                            happened before the counter was read.
+            @return         The number of wraps times 65536 plus the counter.
+        """
+        before = self.wraps.get()
+        irq_state = pyb.disable_irq()
+        current = self.timer.counter()
+        pyb.enable_irq(irq_state)
+        return (self._wraps_at(before, current) << 16) + current
+
+    def _wraps_at(self, before, current):
+        """!@brief          Finds the number of wraps when the counter was read.
+            @details        If a wrap was counted after @c before was read, the
+                            counter's value shows whether it happened before
+                            the counter was read: an overflow leaves the
+                            counter near zero and an underflow leaves it near
+                            the top, as in @c _on_wrap().
+            @param before   The number of wraps read before the counter.
+            @param current  The value read from the counter, with interrupts
+                            turned on again since.
+            @return         The number of wraps to go with @c current.
+        """
+        after = self.wraps.get()
+        if after == before or (after > before) == (current < 0x8000):
+            return after
+        return before
+    
+    def _on_wrap(self, timer):
+        """!@brief          Counts a wrap of the timer's counter.
+            @details        Called by the timer's update interrupt. Right after
+                            an overflow the counter is near zero, and right
+                            after an underflow it is near the top.
+            @param timer    The timer which caused the interrupt.
+        """
+        if timer.counter() < 0x8000:
+            self.wraps.put(self.wraps.get(True) + 1, True)
+        else:
+            self.wraps.put(self.wraps.get(True) - 1, True)
+
+
+class EncoderBank:
+    """!@brief       Reads a group of encoders at the same moment.
+       @details     Reading each encoder in its own task samples the axes at
+                    different times, up to a task period apart. A bank reads
+                    the counters of all its encoders back to back with
+                    interrupts off, takes one timestamp for all of them, and
+                    then works out each position into an array which is
+                    allocated when the bank is made, so every axis in a
+                    snapshot is sampled within a few microseconds.
+                    @code
+                    bank = EncoderBank(encoder_1, encoder_2)
+                    positions = bank.latch()
+                    @endcode
+    """
+
+    def __init__(self, *encoders):
+        """!@brief          Initializes a bank of encoders.
+            @param encoders The encoder objects to be read together.
+        """
+        ## The encoders in the bank.
+        self.encoders = encoders
+        ## The positions in ticks found by the last call to @c latch(), in
+        #  the order in which the encoders were given.
+        self.positions = array.array('l', [0] * len(encoders))
+        ## The @c utime.ticks_us() time at which the counters were last read.
+        self.time = 0
+        self._timers = tuple(enc.timer for enc in encoders)
+        self._raw = array.array('l', [0] * len(encoders))
+        self._wraps = array.array('l', [0] * len(encoders))
+
+    def latch(self):
+        """!@brief          Reads all the encoders at once.
+            @details        For encoders which use the overflow interrupt, the
+                            number of wraps is read before and after the
+                            counters. If a wrap was counted in between, the
+                            counter's value shows whether it happened before
+                            the counter was read, as in @c encoder._wraps_at().
+            @return         The array of positions in ticks.
+        """
+        encoders = self.encoders
+        timers = self._timers
+        raw = self._raw
+        wraps = self._wraps
+        count = len(timers)
+        for idx in range(count):
+            if encoders[idx].wraps is not None:
+                wraps[idx] = encoders[idx].wraps.get()
+
+        # Read the counters back to back, without interrupts
+        irq_state = pyb.disable_irq()
+        for idx in range(count):
+            raw[idx] = timers[idx].counter()
+        self.time = utime.ticks_us()
+        pyb.enable_irq(irq_state)
+
+        for idx in range(count):
+            enc = encoders[idx]
+            if enc.wraps is not None:
+                wraps[idx] = enc._wraps_at(wraps[idx], raw[idx])
+            self.positions[idx] = enc._update(raw[idx], wraps[idx])
+        return self.positions
+
 if __name__ == "__main__":
     #Set up an encoder, have it read 9 times and zero on the tenth.
     my_encoder = encoder(pyb.Pin.board.PC6, pyb.Pin.board.PC7, 8)
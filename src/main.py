@@ -12,15 +12,20 @@
 @date       February 14, 2023
 """
 
-# Import the necessary modules
-import gc
+# Import the necessary modules. The boot timer comes first so it can measure the
+# rest. Everything the tasks use is imported here, before the scheduler starts,
+# so no module is compiled in a task's first run after freeze() has turned off
+# the garbage collector.
+import boottime
 import pyb
 import cotask
 import task_share
-from time import ticks_us, ticks_diff
 from motor_driver import MotorDriver
 from encoder_reader import encoder
-from controller import CLController
+from controller import CLController, PIDController
+from supervisor import Supervisor
+from stepmetrics import StepMetrics
+boottime.mark("imports")
 
 
 # Motor step response controller 1.
@@ -31,7 +36,10 @@ def CLC_fun1(shares):
                       that it is done back to the task manager. This function 
                       specifically setups up the "first" motor (Pins A10, B4, B5, 
                       and Timer 3) and the "first" encoder (Pins C6, C7 and Timer 8).
-        @param shares A list holding the shares used by this task (just one).
+        @param shares A list holding the task's "done" share, the supervisor
+                      which should watch its motor, the @c StepMetrics which
+                      score its response and the task itself; the supervisor
+                      and the metrics may be None.
     """
     ## An initializing state in which the motor, encoder, controller.
     S0_INIT = 0
@@ -47,15 +55,22 @@ def CLC_fun1(shares):
         
         if state == S0_INIT:
                 # Intialize the necessary hardware/software objects for this file.
-                
                 ## A motor object to control duty cycles.
-                my_motor = MotorDriver(pyb.Pin.board.PA10, pyb.Pin.board.PB4, pyb.Pin.board.PB5, 3)
+                my_motor = boottime.measure("motor 1", MotorDriver, pyb.Pin.board.PA10,
+                                            pyb.Pin.board.PB4, pyb.Pin.board.PB5, 3)
                 ## An encoder object to measure the motor's shaft position (in ticks)
-                my_encoder = encoder(pyb.Pin.board.PC6, pyb.Pin.board.PC7, 8)
+                my_encoder = boottime.measure("encoder 1", encoder, pyb.Pin.board.PC6,
+                                              pyb.Pin.board.PC7, 8)
                 ## @brief    A controller object to perfrom closed loop control on the motor using the encoder.
                 #  @details  This controller object uses a gain of 0.10 and a setpoint of 16384 to perform this
                 #            step response. Use this to set the characteristics of the controller.
                 my_controller = CLController(.10, 16384)
+                # Have the supervisor turn the motor off if anything hangs. The
+                # shares are unpacked here, on the first run, since the supervisor
+                # is put in them after the task has been created
+                fun1_done, my_supervisor, my_metrics = shares[0], shares[1], shares[2]
+                if my_supervisor is not None:
+                    my_supervisor.watch(my_motor)
                 
                 # Initialize the "done" share as being false (not done)
                 fun1_done.put(False)
@@ -73,15 +88,21 @@ def CLC_fun1(shares):
             
             # Run 500 times (500 because this task runs on a 10ms period, leading to 5s total)
             if idx < 500:
+                if idx == 0:
+                    boottime.mark("first control step")
                 ## The current encoder reading in ticks.
                 theta = my_encoder.read_encoder()
                 my_motor.set_duty_cycle(my_controller.run(theta))
+                if my_metrics is not None:
+                    my_metrics.add(theta, idx * 10)
                 idx += 1
                 yield None
             
             else:
-                # Turn off the motor and transition to the end state
+                # Turn off the motor, score the response and transition to the end state
                 my_motor.set_duty_cycle(0)
+                if my_metrics is not None:
+                    my_metrics.finish()
                 state = S2_END
                 yield None
             
@@ -98,7 +119,11 @@ def CLC_fun2(shares):
                       that it is done back to the task manager. This function 
                       specifically setups up the "second" motor (Pins C1, A0, A1 
                       and Timer 5) and the "second" encoder (Pins B6, B7 and Timer 4).
-        @param shares A list holding the shares used by this task (just one).
+        @param shares A list holding the task's "done" share, the supervisor
+                      which should watch its motor, the @c StepMetrics which
+                      score its response and the task itself, whose @c dt is
+                      given to the controller; the supervisor and the metrics
+                      may be None, and the metrics aren't used.
     """
     ## An initializing state in which the motor, encoder, controller.
     S0_INIT = 0
@@ -114,15 +139,28 @@ def CLC_fun2(shares):
         
         if state == S0_INIT:
             # Intialize the necessary hardware/software objects for this file.
-            
             ## A motor object to control duty cycles.
-            my_motor = MotorDriver(pyb.Pin.board.PC1, pyb.Pin.board.PA0, pyb.Pin.board.PA1, 5)
+            my_motor = boottime.measure("motor 2", MotorDriver, pyb.Pin.board.PC1,
+                                        pyb.Pin.board.PA0, pyb.Pin.board.PA1, 5)
             ## An encoder object to measure the motor's shaft position (in ticks)
-            my_encoder = encoder(pyb.Pin.board.PB6, pyb.Pin.board.PB7, 4)
+            #  The overflow interrupt keeps the count right even though this task
+            #  only reads it every 50 ms.
+            my_encoder = boottime.measure("encoder 2", encoder, pyb.Pin.board.PB6,
+                                          pyb.Pin.board.PB7, 4, overflow_irq=True)
             ## @brief    A controller object to perfrom closed loop control on the motor using the encoder.
-            #  @details  This controller object uses a gain of 0.10 and a setpoint of 16384 to perform this
-            #            step response. Use this to set the characteristics of the controller.
-            my_controller = CLController(.10, 16384)
+            #  @details  This controller object uses a proportional gain of 0.10, an integral gain of
+            #            0.02 per second, a derivative gain of 0.005 seconds and a setpoint of 16384 to
+            #            perform this step response. With the proportional gain alone, the 50 ms period
+            #            makes the motor oscillate; the derivative term damps this and the integral term
+            #            removes the steady-state error. It is told the actual time between releases of
+            #            this task, so the integral and derivative terms are scaled to match the period.
+            my_controller = PIDController(.10, .02, .005, 16384, 50)
+            # Have the supervisor turn the motor off if anything hangs. The
+            # shares are unpacked here, on the first run, since the supervisor
+            # is put in them after the task has been created
+            fun2_done, my_supervisor, my_task = shares[0], shares[1], shares[3]
+            if my_supervisor is not None:
+                my_supervisor.watch(my_motor)
             
             # Queue up state 1, yield
             state = S1_RUN
@@ -139,7 +177,7 @@ def CLC_fun2(shares):
             if idx < 100:
                 ## The current encoder reading in ticks.
                 theta = my_encoder.read_encoder()
-                my_motor.set_duty_cycle(my_controller.run(theta))
+                my_motor.set_duty_cycle(my_controller.run(theta, my_task.dt))
                 idx += 1
                 yield None
             
@@ -165,29 +203,69 @@ if __name__ == "__main__":
     fun1_done = task_share.Share('b', thread_protect=False, name="Share 0")
     ## The share indicating when task 2 is done.
     fun2_done = task_share.Share('b', thread_protect=False, name="Share 1")
+    ## @brief    The metrics of task 1's step response.
+    #  @details  They are worked out as the response runs and put into a queue of
+    #            floats when it finishes, so no samples need to be logged.
+    fun1_metrics = StepMetrics(16384)
     
 
+    ## @brief    The shares used by each task: its "done" share, the supervisor, the
+    #            metrics of its response (task 1 only) and the task itself.
+    #  @details  The tasks and the supervisor don't exist yet, so their places are
+    #            filled in below.
+    task1_shares = [fun1_done, None, fun1_metrics, None]
+    task2_shares = [fun2_done, None, None, None]
+
     # Create the tasks
     ## The first motor step response task that will run on a period of 10 ms.
-    task1 = cotask.Task(CLC_fun1, name="Task_1", priority=1, period=10, shares = (fun1_done))
-    ## The second motor step response task that will run on a period of 50 ms.
-    task2 = cotask.Task(CLC_fun2, name="Task_2", priority=2, period=50, shares = (fun2_done))
+    task1 = cotask.Task(CLC_fun1, name="Task_1", priority=1, period=10, shares = task1_shares)
+    ## @brief    The second motor step response task that will run on a period of 50 ms.
+    #  @details  Its 5 ms phase puts its releases halfway between those of task 1,
+    #            so the two motor loops never share a slot of the frame.
+    task2 = cotask.Task(CLC_fun2, name="Task_2", priority=2, period=50, shares = task2_shares,
+                        phase=5)
+    task1_shares[3] = task1
+    task2_shares[3] = task2
     # Add the tasks to the task list.
     cotask.task_list.append(task1)
     cotask.task_list.append(task2)
+    
+    # Release both tasks on a common 5 ms base tick
+    cotask.task_list.align()
+    boottime.mark("tasks created")
+
+    ## @brief    A supervisor which disables the motors if a task stops running.
+    #  @details  It checks from timer 7's interrupt that each task runs at least once
+    #            in three periods and that the scheduler loop below keeps going.
+    my_supervisor = Supervisor(cotask.task_list)
+    task1_shares[1] = my_supervisor
+    task2_shares[1] = my_supervisor
 
-    # Clear up memory before starting
-    gc.collect()
+    # Clear up memory and stop the garbage collector from running on its own
+    # while the motors are being controlled
+    cotask.task_list.freeze()
 
     # Run the scheduler with the chosen scheduling algorithm. Quit if ^C pressed or
     # if both motor step responses have finished.
     while True:
         try:
-            cotask.task_list.pri_sched()
+            cotask.task_list.frame_sched()
+            cotask.task_list.idle_collect()
+            my_supervisor.kick()
+            # Start watching once both tasks have set up their motors
+            if not my_supervisor.running and len(my_supervisor.motors) == 2:
+                my_supervisor.start()
+            if my_supervisor.faulted:
+                break
             if fun1_done.get() == True and fun2_done.get() == True:
                 break
         except KeyboardInterrupt:
             break
+    my_supervisor.stop()
+    print(my_supervisor.report())
+    if fun1_done.get():
+        print(fun1_metrics.report())
 
-    # Print message for leaving program
+    # Print how long start-up took and a message for leaving program
+    print(boottime.report())
     print('Bye bye.')
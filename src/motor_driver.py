@@ -11,13 +11,18 @@
 
 import time, pyb
 
+## The longest dead time in microseconds, which bounds how long a reversal
+#  keeps the caller waiting.
+MAX_DEAD_TIME = 500
+
 class MotorDriver:
     """!@brief       Implements an motor driver class to be used in lab.
        @details     A motor driver class compatible with the motors in the ME 405
                     lab kits. Allows for motors to have their duty cycles set.
     """
     
-    def __init__(self, enPin, pin1, pin2, timer):
+    def __init__(self, enPin, pin1, pin2, timer, channels=(1, 2), slew=None,
+                 dead_time=0):
         """!@brief          Initializes a motor driver object.
             @details        Using pin objects and a timer channel, is able to set
                             up a motor to be properly used (assuming the proper
@@ -26,7 +31,18 @@ class MotorDriver:
             @param pin1     The pin that controls the positive duty cycle of the motor.
             @param pin2     The pin that controls the negative duty cycle of the motor.
             @param timer    The timer compatible with pins 1 and 2.
+            @param channels The timer channels linked to pins 1 and 2, so that
+                            two motors can share one timer.
+            @param slew     The largest change in duty cycle, in percent, which
+                            is allowed from one update to the next, or None
+                            for no limit.
+            @param dead_time  The time in microseconds for which both sides of
+                            the motor are left off when it changes direction,
+                            up to @c MAX_DEAD_TIME.
         """
+        if not 0 <= dead_time <= MAX_DEAD_TIME:
+            raise ValueError("dead_time must be from 0 to "
+                             + str(MAX_DEAD_TIME) + " us")
         ## Pin object representing the connection to the positive input of the motor.
         self.pin1 = pyb.Pin(pin1, pyb.Pin.OUT_PP)
         ## Pin object representing the connection to the negative input of the motor.
@@ -37,9 +53,26 @@ class MotorDriver:
         ## Timer object compatible with pins 1 and 2 for pulse width modulation.
         self.timer = pyb.Timer(timer, freq = 20000)
         ## Channel 1 of the timer, linked to pin 1 for positive motor control.
-        self.ch1 = self.timer.channel(1, pyb.Timer.PWM, pin=self.pin1)
+        self.ch1 = self.timer.channel(channels[0], pyb.Timer.PWM, pin=self.pin1)
         ## Channel 2 of the timer, linked to pin 2 for negative motor control.
-        self.ch2 = self.timer.channel(2, pyb.Timer.PWM, pin=self.pin2)
+        self.ch2 = self.timer.channel(channels[1], pyb.Timer.PWM, pin=self.pin2)
+        ## The largest change in duty cycle allowed per update, or None.
+        self.slew = slew
+        ## The time in microseconds the motor is left off when it reverses.
+        self.dead_time = dead_time
+        ## The duty cycle, in percent, most recently applied to the motor.
+        self.duty = 0
+        ## The timer compare count which gives a 100% duty cycle.
+        self.full_scale = self.timer.period() + 1
+        # The duty cycle staged for the next apply() and the duty cycles last
+        # written to each channel (-1 after a compare count was written)
+        self._pending = 0
+        self._duty1 = 0
+        self._duty2 = 0
+        # The compare counts last written to each channel by set_duty_raw(),
+        # or -1 if a duty cycle in percent was written since
+        self._raw1 = -1
+        self._raw2 = -1
         
         # Set the channels to 0% duty cycle
         self.ch1.pulse_width_percent(0)
@@ -52,21 +85,106 @@ class MotorDriver:
         """!@brief          Sets the motor's duty cycle.
             @param percent  Percent the duty cycle should be set to. Value between -100% and 100%.
         """
+        self.stage(percent)
+        self.apply()
+    
+    def stage(self, percent):
+        """!@brief          Works out the next duty cycle without applying it.
+            @details        The duty cycle is limited to the range of -100% to
+                            100% and by the slew limit. It is written to the
+                            timer by the next apply().
+            @param percent  Percent the duty cycle should be set to. Value between -100% and 100%.
+        """
         # Prevents impossible duty cycles
         if percent > 100:
             percent = 100
         elif percent < -100:
             percent = -100
         
+        # Limit how fast the duty cycle can change
+        if self.slew:
+            if percent > self.duty + self.slew:
+                percent = self.duty + self.slew
+            elif percent < self.duty - self.slew:
+                percent = self.duty - self.slew
+        
+        self._pending = percent
+    
+    def apply(self):
+        """!@brief          Writes the staged duty cycle to the timer channels.
+            @details        Each channel is only written if its duty cycle has
+                            changed, and the channel being turned off is always
+                            written before the one being turned on. When the
+                            motor reverses, both channels are left off for the
+                            dead time, which is waited out here with
+                            @c pyb.udelay() so it doesn't depend on how often
+                            the duty cycle is set.
+        """
+        percent = self._pending
+        self.duty = percent
+        self._raw1 = -1
+        self._raw2 = -1
+        
         # Spin in the counter clockwise direction
         if percent > 0:
-            self.ch1.pulse_width_percent(0)
-            self.ch2.pulse_width_percent(percent)
+            if self._duty1:
+                self.ch1.pulse_width_percent(0)
+                self._duty1 = 0
+                if self.dead_time:
+                    pyb.udelay(self.dead_time)
+            if self._duty2 != percent:
+                self.ch2.pulse_width_percent(percent)
+                self._duty2 = percent
         
         # Spin in the clockwise direction
         else:
-            self.ch2.pulse_width_percent(0)
-            self.ch1.pulse_width_percent(-percent)
+            if self._duty2:
+                self.ch2.pulse_width_percent(0)
+                self._duty2 = 0
+                if percent and self.dead_time:
+                    pyb.udelay(self.dead_time)
+            if self._duty1 != -percent:
+                self.ch1.pulse_width_percent(-percent)
+                self._duty1 = -percent
+            
+    def set_duty_raw(self, counts):
+        """!@brief          Sets the motor's duty cycle as a timer compare count.
+            @details        The count is written straight to the timer, so no
+                            floats are used and no memory is allocated. The
+                            slew limit is not applied, but the dead time is.
+                            @c duty is set to the nearest whole percent below.
+            @param counts   The compare count, from -full_scale to full_scale,
+                            with the sign giving the direction as for
+                            @c set_duty_cycle().
+        """
+        full = self.full_scale
+        if counts > full:
+            counts = full
+        elif counts < -full:
+            counts = -full
+        self.duty = counts * 100 // full
+        self._duty1 = -1
+        self._duty2 = -1
+        
+        # Turn the other channel off first, then set the one being driven
+        if counts > 0:
+            if self._raw1:
+                self.ch1.pulse_width(0)
+                self._raw1 = 0
+                if self.dead_time:
+                    pyb.udelay(self.dead_time)
+            if self._raw2 != counts:
+                self.ch2.pulse_width(counts)
+                self._raw2 = counts
+        else:
+            if self._raw2:
+                self.ch2.pulse_width(0)
+                self._raw2 = 0
+                if counts and self.dead_time:
+                    pyb.udelay(self.dead_time)
+            if self._raw1 != -counts:
+                self.ch1.pulse_width(-counts)
+                self._raw1 = -counts
             
     def enable(self):
         """!@brief      Enables the motor for use. Note: motor is enabled after intialization automatically.
@@ -77,9 +195,42 @@ class MotorDriver:
         """!@brief      Disables the motor.
         """
         self.enPin.low()
-                
         
+
+class MotorBank:
+    """!@brief      Updates several motors together.
+       @details     Duty cycles are staged for each motor and then all written
+                    back-to-back with interrupts disabled, so that motors which
+                    share a timer all change in the same PWM period.
+    """
+    
+    def __init__(self, *motors):
+        """!@brief          Initializes a bank of motors.
+            @param motors   The motor driver objects to be updated together.
+        """
+        ## The motor driver objects in the bank.
+        self.motors = motors
+    
+    def set(self, idx, percent):
+        """!@brief          Stages a new duty cycle for one motor in the bank.
+            @param idx      The position of the motor in the bank.
+            @param percent  Percent the duty cycle should be set to. Value between -100% and 100%.
+        """
+        self.motors[idx].stage(percent)
+    
+    def apply(self):
+        """!@brief          Writes the staged duty cycles of all the motors.
+            @details        The dead time of any motor which reverses is waited
+                            out with interrupts off, which is why it is
+                            limited to @c MAX_DEAD_TIME.
+        """
+        irq_state = pyb.disable_irq()
+        for motor in self.motors:
+            motor.apply()
+        pyb.enable_irq(irq_state)
         
+        
+
 if __name__ == "__main__":
     # Set up a motor object and cycle through a range of duty cycles.
     my_motor = MotorDriver(pyb.Pin.board.PA10, pyb.Pin.board.PB4, pyb.Pin.board.PB5, 3)
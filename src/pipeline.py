@@ -0,0 +1,261 @@
+"""!@file pipeline.py
+@brief      Connects tasks into chains of stages joined by queues.
+@details    Contains the "Pipeline" and "Stage" classes, which let a chain of
+            processing steps, such as encoder → filter → controller → motor
+            → logger, be declared rather than wired together by hand. Each
+            stage is a cotask task which runs a function on a batch of items
+            taken from the queues of the stages before it and puts the items
+            it produces, up to a set number each run, into a queue for each
+            stage after it.
+
+            Queue sizes are worked out from the periods and batch sizes of the
+            stages at either end: a queue holds what its producer makes while
+            its consumer waits for its next run, plus a run of each for
+            timing jitter. A consumer which can't keep up with its producer
+            is reported when the stage is added rather than when its queue
+            overflows. If a stage's output queue hasn't room for all the items
+            the stage might produce, the stage doesn't run, so backpressure
+            flows up the chain instead of data being lost, and the stage counts
+            the run as blocked.
+
+            A stage function is called with a tuple of input arrays (one for
+            each stage before it), an array of the number of items in each,
+            and an output array which holds one run's output. It returns the
+            number of items it wrote into the output array. Items are copied
+            into and out of these preallocated arrays, so running a stage
+            doesn't allocate memory.
+
+            Example:
+            @code
+            def read(ins, counts, out):
+                out[0] = my_encoder.read_encoder()
+                return 1
+
+            def average(ins, counts, out):
+                total = 0
+                for idx in range(counts[0]):
+                    total += ins[0][idx]
+                out[0] = total / counts[0]
+                return 1
+
+            def log(ins, counts, out):
+                for idx in range(counts[0]):
+                    print(ins[0][idx])
+                return 0
+
+            chain = Pipeline()
+            enc = chain.add(read, "Read", period=10, priority=3)
+            avg = chain.add(average, "Average", period=50, priority=2, batch=5)
+            chain.add(log, "Log", period=200, priority=1, batch=8)
+            # ... later
+            print(chain.report())
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import array, utime
+import cotask, task_share
+
+
+class Stage:
+    """!@brief      One step in a pipeline, run as a cotask task.
+    """
+
+    def __init__(self, fun, name, period, batch, produce, type_code):
+        """!@brief              Initializes a stage; used by @c Pipeline.add().
+            @param fun          The function which processes a batch.
+            @param name         The stage's name, also used for its task.
+            @param period       The stage's period in milliseconds.
+            @param batch        The most items taken from each input in one run.
+            @param produce      The most items produced in one run.
+            @param type_code    The @c array type code of the items produced.
+        """
+        ## The stage's name.
+        self.name = name
+        ## The stage's period in milliseconds.
+        self.period = period
+        ## The most items taken from each input in one run.
+        self.batch = batch
+        ## The most items produced in one run.
+        self.produce = produce
+        ## The @c array type code of the items the stage produces.
+        self.type_code = type_code
+        ## The number of times the stage's function has run.
+        self.runs = 0
+        ## The number of items taken from the stage's input queues.
+        self.items_in = 0
+        ## The number of items the stage has produced.
+        self.items_out = 0
+        ## The number of runs skipped because an output queue was too full.
+        self.blocked = 0
+        ## The task which runs the stage, made by @c Pipeline.add().
+        self.task = None
+
+        self._fun = fun
+        # The queues in and out, and the buffers items are copied through
+        self._inputs = []
+        self._outputs = []
+        self._in_bufs = ()
+        self._counts = None
+        self._out_buf = array.array(type_code, [0] * produce)
+        self._start = utime.ticks_ms()
+
+    def _connect(self, source, queue):
+        """!@brief          Adds an input queue carrying a source stage's items.
+            @param source   The stage which puts items into the queue.
+            @param queue    The queue joining the two stages.
+        """
+        self._inputs.append(queue)
+        self._in_bufs += (array.array(source.type_code, [0] * self.batch),)
+        self._counts = array.array('H', [0] * len(self._inputs))
+        source._outputs.append(queue)
+
+    def run(self):
+        """!@brief      A generator which runs the stage once each time it's resumed.
+        """
+        batch = self.batch
+        while True:
+            # Only run if every output queue has room for a whole run's output
+            for queue in self._outputs:
+                if queue.size() - queue.num_in() < self.produce:
+                    self.blocked += 1
+                    break
+            else:
+                # Take up to a batch of items from each input
+                total = 0
+                for idx in range(len(self._inputs)):
+                    queue = self._inputs[idx]
+                    buf = self._in_bufs[idx]
+                    count = 0
+                    while count < batch and queue.any():
+                        buf[count] = queue.get()
+                        count += 1
+                    self._counts[idx] = count
+                    total += count
+
+                # A stage with inputs waits until at least one has items
+                if total or not self._inputs:
+                    made = self._fun(self._in_bufs, self._counts,
+                                     self._out_buf)
+                    self.runs += 1
+                    self.items_in += total
+                    if made:
+                        self.items_out += made
+                        for queue in self._outputs:
+                            for idx in range(made):
+                                queue.put(self._out_buf[idx])
+            yield 0
+
+    def throughput(self):
+        """!@brief      Finds the average rate at which the stage produced items.
+            @return     The items produced per second since the stage was made,
+                        or the items taken in per second for a stage with no
+                        outputs.
+        """
+        secs = utime.ticks_diff(utime.ticks_ms(), self._start) / 1000
+        if secs <= 0:
+            return 0.0
+        return (self.items_out if self._outputs else self.items_in) / secs
+
+
+class Pipeline:
+    """!@brief      A graph of stages joined by queues.
+    """
+
+    def __init__(self, task_list=cotask.task_list, registry=None, slack=1):
+        """!@brief              Initializes an empty pipeline.
+            @param task_list    The task list to which the stages' tasks are
+                                added.
+            @param registry     The list to which the queues are added, or
+                                @c None for @c task_share.share_list.
+            @param slack        The number of extra runs of each consumer
+                                by which it may fall behind, which the queues
+                                are made big enough to cover.
+        """
+        ## The task list to which stage tasks are added.
+        self.task_list = task_list
+        ## The stages, in the order in which they were added.
+        self.stages = []
+        ## The queues joining the stages, as (source, destination, queue).
+        self.edges = []
+        self._registry = registry
+        self._slack = slack
+
+    def add(self, fun, name, period, priority=1, batch=1, produce=1,
+            type_code='f', after=-1):
+        """!@brief              Adds a stage to the pipeline.
+            @details            A queue is made from each stage in @c after to
+                                the new stage. Stages must be added before the
+                                task list is frozen.
+            @param fun          The function which processes a batch, called as
+                                @c fun(ins, counts, out).
+            @param name         The stage's name.
+            @param period       The stage's period in milliseconds.
+            @param priority     The priority of the stage's task.
+            @param batch        The most items taken from each input in one run.
+            @param produce      The most items produced in one run.
+            @param type_code    The @c array type code of the items produced.
+            @param after        The stage or tuple of stages feeding this one,
+                                @c None for a stage with no inputs, or -1 (the
+                                default) for the last stage added.
+            @return             The new stage.
+        """
+        if after == -1:
+            after = (self.stages[-1],) if self.stages else ()
+        elif after is None:
+            after = ()
+        elif isinstance(after, Stage):
+            after = (after,)
+
+        stage = Stage(fun, name, period, batch, produce, type_code)
+        for source in after:
+            queue = task_share.Queue(source.type_code,
+                                     self.queue_size(source, stage),
+                                     name=source.name + '>' + name,
+                                     registry=self._registry)
+            stage._connect(source, queue)
+            self.edges.append((source, stage, queue))
+
+        stage.task = cotask.Task(stage.run, name=name, priority=priority,
+                                 period=period)
+        self.task_list.append(stage.task)
+        self.stages.append(stage)
+        return stage
+
+    def queue_size(self, source, dest):
+        """!@brief          Works out how big the queue between two stages must be.
+            @details        The queue holds what the source can make while the
+                            destination waits for its next run and @c slack
+                            more, plus one run's worth from each for jitter.
+            @param source   The producing stage.
+            @param dest     The consuming stage.
+            @return         The number of items the queue should hold.
+        """
+        # Compare rates by cross-multiplying to stay with integers
+        if dest.batch * source.period < source.produce * dest.period:
+            raise ValueError("Stage " + dest.name + " can't keep up with "
+                             + source.name + "; give it a larger batch or a "
+                             "shorter period")
+        runs = -(-(1 + self._slack) * dest.period // source.period)
+        return runs * source.produce + source.produce + dest.batch
+
+    def report(self):
+        """!@brief      Creates a table of each stage's throughput and backpressure.
+            @return     A string with a line for each stage, showing its runs,
+                        items in and out, runs blocked by full queues and
+                        throughput in items per second, then a line for each
+                        queue showing its high-water mark and size.
+        """
+        lines = ['STAGE           RUNS     IN    OUT BLOCKED  ITEMS/S']
+        for stage in self.stages:
+            lines.append('{:<12s}{:8d}{:7d}{:7d}{:8d}{:9.1f}'.format(
+                stage.name, stage.runs, stage.items_in, stage.items_out,
+                stage.blocked, stage.throughput()))
+        lines.append('QUEUE                 MAX FULL  SIZE')
+        for source, dest, queue in self.edges:
+            lines.append('{:<22s}{:9d}{:6d}'.format(queue._name,
+                         queue.max_full(), queue.size()))
+        return '\n'.join(lines)
@@ -0,0 +1,219 @@
+"""!@file precache.py
+@brief      Keeps precomputed tables in flash so they needn't be rebuilt at boot.
+@details    Contains the "Cache" class, which stores arrays such as trajectory
+            profiles, gain schedules and output maps in the board's flash,
+            each under a key made by hashing the parameters it was built from
+            (such as a gain, a setpoint and a task period). When a table is
+            asked for, it is read straight into a buffer the caller has
+            allocated if a file for its parameters exists, and only built,
+            with the slow float math, if it doesn't. Changing any parameter
+            changes the key, so a stale table is never loaded.
+
+            Each file holds a short header followed by the array's raw bytes:
+            | Field       | Format  | Contents                                   |
+            |:------------|:--------|:-------------------------------------------|
+            | Magic       | 4s      | @c MAGIC                                   |
+            | Type code   | B       | the array's type code, as a character code |
+            | Generation  | I       | when the file was written, counting up     |
+            | Count       | I       | the number of items in the array           |
+
+            MicroPython can't map files into memory, so files are read with
+            @c readinto(), which copies into the buffer without allocating.
+            When the file system runs low on space, the files written longest
+            ago are deleted to make room.
+
+            Example:
+            @code
+            cache = Cache()
+            table = array.array('f', bytes(201 * 4))
+            def build(out):
+                out[:] = output_map(5, 3)
+            cache.get(('output_map', 5, 3), table, 'f', build)
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import os, struct
+
+try:
+    import hashlib
+except ImportError:
+    import uhashlib as hashlib
+try:
+    import binascii
+except ImportError:
+    import ubinascii as binascii
+
+## The bytes at the start of every cache file.
+MAGIC = b'PCC1'
+## The layout of a cache file's header: magic, type code, generation, count.
+HEADER_FMT = '<4sBII'
+## The ending of cache file names.
+SUFFIX = '.bin'
+
+
+def key(params):
+    """!@brief          Makes the key under which a table is stored.
+        @param params   The parameters the table is built from, such as a tuple
+                        of a name, gains and a period. Their @c repr() is
+                        hashed, so they should be numbers, strings and tuples.
+        @return         A string of 16 hexadecimal digits from the SHA-256 hash
+                        of the parameters.
+    """
+    digest = hashlib.sha256(repr(params).encode()).digest()
+    return binascii.hexlify(digest[:8]).decode()
+
+
+class Cache:
+    """!@brief      Stores and loads precomputed arrays in files keyed by parameters.
+    """
+
+    def __init__(self, directory='/flash/cache', min_free=16384):
+        """!@brief              Initializes a cache in a directory.
+            @details            The directory is made if it doesn't exist, and
+                                the newest generation among its files is found.
+            @param directory    The directory holding the cache files.
+            @param min_free     The number of bytes to leave free on the file
+                                system after writing a file.
+        """
+        ## The directory holding the cache files.
+        self.directory = directory
+        ## The number of bytes left free on the file system after a write.
+        self.min_free = min_free
+        ## The number of tables loaded from files.
+        self.hits = 0
+        ## The number of tables which had to be built.
+        self.misses = 0
+        ## The number of files deleted to make room.
+        self.evictions = 0
+        self._header = bytearray(struct.calcsize(HEADER_FMT))
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass
+        self._generation = 0
+        for name, generation in self._entries():
+            if generation >= self._generation:
+                self._generation = generation + 1
+
+    def get(self, params, out, type_code, build):
+        """!@brief          Fills a buffer with a table, loading it if it's cached.
+            @details        If no valid file holds the table for these
+                            parameters, @c build is called to fill the buffer
+                            and the result is saved for next time.
+            @param params   The parameters the table is built from.
+            @param out      A preallocated array of the table's type and length.
+            @param type_code The array's type code, which MicroPython arrays
+                            don't keep where it can be read.
+            @param build    A function called with @c out which fills it in.
+            @return         True if the table was loaded from the cache.
+        """
+        path = self._path(key(params))
+        if self._load(path, out, type_code):
+            self.hits += 1
+            return True
+        self.misses += 1
+        build(out)
+        self._store(path, out, type_code)
+        return False
+
+    def clear(self):
+        """!@brief          Deletes every file in the cache.
+        """
+        for name, generation in self._entries():
+            os.remove(self.directory + '/' + name)
+
+    def _path(self, name):
+        """!@brief          Makes the path of the file for a key.
+            @param name     The key.
+            @return         The path of the file.
+        """
+        return self.directory + '/' + name + SUFFIX
+
+    def _load(self, path, out, type_code):
+        """!@brief          Reads a file into a buffer if it matches the buffer.
+            @param path     The path of the file.
+            @param out      The array to read into.
+            @param type_code The array's type code.
+            @return         True if the file was found and read.
+        """
+        try:
+            with open(path, 'rb') as file:
+                if file.readinto(self._header) != len(self._header):
+                    return False
+                magic, code, generation, count = struct.unpack(HEADER_FMT,
+                                                               self._header)
+                if magic != MAGIC or code != ord(type_code) \
+                        or count != len(out):
+                    return False
+                size = count * struct.calcsize(type_code)
+                return file.readinto(memoryview(out)) == size
+        except OSError:
+            return False
+
+    def _store(self, path, out, type_code):
+        """!@brief          Writes a buffer to a file, making room if needed.
+            @param path     The path of the file.
+            @param out      The array to write.
+            @param type_code The array's type code.
+        """
+        size = len(out) * struct.calcsize(type_code) + len(self._header)
+        self._make_room(size)
+        struct.pack_into(HEADER_FMT, self._header, 0, MAGIC, ord(type_code),
+                         self._generation, len(out))
+        self._generation += 1
+        try:
+            with open(path, 'wb') as file:
+                file.write(self._header)
+                file.write(memoryview(out))
+        except OSError:
+            # A table which can't be saved is simply rebuilt next time
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _free(self):
+        """!@brief          Finds the free space on the cache's file system.
+            @return         The number of bytes free.
+        """
+        stats = os.statvfs(self.directory)
+        return stats[1] * stats[4]
+
+    def _make_room(self, size):
+        """!@brief          Deletes the oldest files until a new one will fit.
+            @param size     The size in bytes of the file to be written.
+        """
+        if self._free() >= size + self.min_free:
+            return
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        for name, generation in entries:
+            os.remove(self.directory + '/' + name)
+            self.evictions += 1
+            if self._free() >= size + self.min_free:
+                return
+
+    def _entries(self):
+        """!@brief          Lists the cache files and their generations.
+            @return         A list of (file name, generation) tuples; files
+                            without a valid header are given generation -1
+                            so they're the first to be deleted.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            generation = -1
+            try:
+                with open(self.directory + '/' + name, 'rb') as file:
+                    if file.readinto(self._header) == len(self._header):
+                        fields = struct.unpack(HEADER_FMT, self._header)
+                        if fields[0] == MAGIC:
+                            generation = fields[2]
+            except OSError:
+                pass
+            entries.append((name, generation))
+        return entries
@@ -0,0 +1,134 @@
+"""!@file recorder.py
+@brief      Records what a motor control task sees and does, for replay.
+@details    Contains the "Recorder" class, which logs every value read from
+            an encoder's timer counter and every duty cycle given to a motor,
+            in the order in which they happen. The log is delta encoded: each
+            entry stores the change from the previous value of its kind as a
+            variable-length integer, so most entries take one or two bytes.
+            A log saved from a rig can be replayed through the unchanged task
+            code on a computer by @c host/replay.py.
+
+            Example, in a task's initialization state:
+            @code
+            my_recorder = Recorder(8000)
+            my_recorder.attach(my_encoder, my_motor)
+            # ... after the run
+            my_recorder.save('run1.rpl')
+            @endcode
+            Only encoders which don't use the overflow interrupt can be
+            replayed, since the times at which interrupts happen aren't
+            recorded.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+## The bytes at the start of a saved log.
+MAGIC = b'RPL1'
+## The kind of entry holding a change in the timer counter.
+COUNTER = 0
+## The kind of entry holding a change in duty cycle, in hundredths of a percent.
+DUTY = 1
+
+
+class Recorder:
+    """!@brief      Logs encoder counter reads and motor duty cycles.
+       @details     The log's memory is allocated when the recorder is made.
+                    If it fills up, recording stops and @c full is set.
+    """
+
+    def __init__(self, size):
+        """!@brief          Initializes a recorder with a log of a given size.
+            @param size     The number of bytes in the log.
+        """
+        ## The number of bytes of the log which have been used.
+        self.used = 0
+        ## True if the log ran out of room and recording stopped.
+        self.full = False
+        self._log = bytearray(size)
+        self._last = [0, 0]
+
+    def attach(self, encoder, motor):
+        """!@brief          Starts recording an encoder and a motor.
+            @details        The encoder's timer is replaced by a stand-in which
+                            logs each counter value it reads, and the motor's
+                            @c set_duty_cycle() logs the duty cycle applied.
+                            This should be done before the encoder is zeroed.
+            @param encoder  The encoder object to record.
+            @param motor    The motor driver object to record.
+        """
+        encoder.timer = _RecordingTimer(encoder.timer, self)
+        set_duty_cycle = motor.set_duty_cycle
+
+        def recording_set_duty_cycle(percent):
+            set_duty_cycle(percent)
+            self.log(DUTY, int(motor.duty * 100))
+
+        motor.set_duty_cycle = recording_set_duty_cycle
+
+    def log(self, kind, value):
+        """!@brief          Adds an entry to the log.
+            @details        The change from the last value of the same kind is
+                            zigzag encoded so small changes either way are small
+                            numbers, the kind is put in the lowest bit, and the
+                            result is written seven bits per byte with the top
+                            bit set on all but the last byte.
+            @param kind     Either @c COUNTER or @c DUTY.
+            @param value    The integer value to record.
+        """
+        # Once an entry hasn't fit, stop, so the log never skips an entry
+        if self.full:
+            return
+        delta = value - self._last[kind]
+        token = (((delta << 1) if delta >= 0 else ((-delta << 1) - 1)) << 1) \
+            | kind
+        log = self._log
+        idx = self.used
+        while True:
+            if idx >= len(log):
+                self.full = True
+                return
+            if token < 0x80:
+                log[idx] = token
+                break
+            log[idx] = (token & 0x7F) | 0x80
+            token >>= 7
+            idx += 1
+        # Only a whole entry moves the end of the log and the last value
+        self.used = idx + 1
+        self._last[kind] = value
+
+    def save(self, path):
+        """!@brief          Writes the log to a file.
+            @param path     The name of the file to write.
+        """
+        with open(path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(memoryview(self._log)[:self.used])
+
+
+class _RecordingTimer:
+    """!@brief      Stands in for a timer, logging each counter value read.
+    """
+
+    def __init__(self, timer, recorder):
+        """!@brief          Wraps a timer.
+            @param timer    The timer whose counter is recorded.
+            @param recorder The recorder which logs the counter values.
+        """
+        self._timer = timer
+        self._recorder = recorder
+
+    def counter(self):
+        """!@brief          Reads the timer's counter and logs the value.
+            @return         The counter value.
+        """
+        value = self._timer.counter()
+        self._recorder.log(COUNTER, value)
+        return value
+
+    def __getattr__(self, name):
+        """!@brief          Passes anything else through to the timer.
+        """
+        return getattr(self._timer, name)
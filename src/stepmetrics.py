@@ -0,0 +1,190 @@
+"""!@file stepmetrics.py
+@brief      Scores a step response as it runs, without storing it.
+@details    Contains the "StepMetrics" class, which is given one sample at a
+            time by a control task and keeps only running totals, so its memory
+            use doesn't grow with the length of the run. When the run is over
+            it works out:
+            | Index          | Metric                                              |
+            |:---------------|:----------------------------------------------------|
+            | @c RISE        | 10% to 90% rise time, in ms                         |
+            | @c OVERSHOOT   | peak overshoot, in percent of the step              |
+            | @c SETTLING    | time after which the response stays in the band, ms |
+            | @c SS_ERROR    | mean error once settled (or the last error), ticks  |
+            | @c IAE         | integral of absolute error, tick seconds            |
+            | @c ISE         | integral of squared error, tick squared seconds     |
+            | @c FREQUENCY   | oscillation frequency about the setpoint, in Hz     |
+            and puts them in that order into a @c task_share.Queue of floats,
+            so another task, or the program after the scheduler stops, can
+            read them. Metrics which never happened, such as a rise time for
+            a response which never reached 90%, are NaN. If the setpoint is
+            the same as the starting value there is no step, so the rise
+            time, overshoot and settling time are NaN and the steady-state
+            error is the mean error over the whole run.
+
+            This lets long sweeps of gains or periods be scored on the board
+            rather than by logging every sample and plotting it.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import array
+import task_share
+
+## Index of the 10% to 90% rise time in ms.
+RISE = 0
+## Index of the peak overshoot in percent of the step.
+OVERSHOOT = 1
+## Index of the settling time in ms.
+SETTLING = 2
+## Index of the steady-state error in ticks.
+SS_ERROR = 3
+## Index of the integral of absolute error.
+IAE = 4
+## Index of the integral of squared error.
+ISE = 5
+## Index of the oscillation frequency in Hz.
+FREQUENCY = 6
+## The number of metrics.
+NUM_METRICS = 7
+
+_NAN = float('nan')
+
+
+class StepMetrics:
+    """!@brief      Computes step response metrics one sample at a time.
+    """
+
+    def __init__(self, setpoint, start=0, band=0.02, results=None):
+        """!@brief              Initializes the metrics for a step response.
+            @param setpoint     The setpoint the response steps to.
+            @param start        The value the response starts from.
+            @param band         The settling band, as a fraction of the step.
+            @param results      A float queue of at least @c NUM_METRICS items
+                                which the metrics are put into by @c finish(),
+                                or None to make one.
+        """
+        ## The setpoint the response steps to.
+        self.setpoint = setpoint
+        ## The value the response starts from.
+        self.start = start
+        ## The settling band, as a fraction of the step.
+        self.band = band
+        ## The queue into which @c finish() puts the metrics.
+        self.results = results if results is not None \
+            else task_share.Queue('f', NUM_METRICS, name='Step metrics')
+        ## The metrics found by the last call to @c finish(), by index.
+        self.values = array.array('f', [_NAN] * NUM_METRICS)
+        self.reset()
+
+    def reset(self):
+        """!@brief      Clears the running totals for a new run.
+        """
+        self._step = self.setpoint - self.start
+        self._prev_time = None
+        self._prev_error = 0
+        self._t10 = None
+        self._t90 = None
+        self._peak = None
+        self._last_out = 0
+        self._settled_sum = 0
+        self._settled_count = 0
+        self._iae = 0
+        self._ise = 0
+        self._sign = 0
+        self._crossings = 0
+        self._first_cross = 0
+        self._last_cross = 0
+
+    def add(self, value, time):
+        """!@brief          Adds one sample of the response.
+            @param value    The measured value, such as an encoder reading.
+            @param time     The time of the sample in ms since the step.
+        """
+        error = self.setpoint - value
+        # With no step, every sample counts as being at the setpoint
+        frac = (value - self.start) / self._step if self._step else 1
+
+        # Integrate the error over the time since the last sample, holding
+        # the last error as the control task does
+        if self._prev_time is not None:
+            dt = (time - self._prev_time) / 1000
+            self._iae += abs(self._prev_error) * dt
+            self._ise += self._prev_error * self._prev_error * dt
+        self._prev_time = time
+        self._prev_error = error
+
+        # Rise and overshoot
+        if self._t10 is None and frac >= 0.1:
+            self._t10 = time
+        if self._t90 is None and frac >= 0.9:
+            self._t90 = time
+        if self._peak is None or frac > self._peak:
+            self._peak = frac
+
+        # Settling: restart the steady-state average whenever the response
+        # leaves the band
+        if abs(1 - frac) > self.band:
+            self._last_out = time
+            self._settled_sum = 0
+            self._settled_count = 0
+        else:
+            self._settled_sum += error
+            self._settled_count += 1
+
+        # Count crossings of the setpoint which leave the band on the other
+        # side, so noise near the setpoint isn't counted
+        if abs(1 - frac) > self.band:
+            sign = 1 if error > 0 else -1
+            if sign != self._sign:
+                if self._sign:
+                    if not self._crossings:
+                        self._first_cross = time
+                    self._last_cross = time
+                    self._crossings += 1
+                self._sign = sign
+
+    def finish(self):
+        """!@brief      Works out the metrics and puts them into the results queue.
+            @return     The array of metrics, by index.
+        """
+        values = self.values
+        values[RISE] = self._t90 - self._t10 if self._t90 is not None \
+            else _NAN
+        if self._peak is None:
+            values[OVERSHOOT] = _NAN
+        else:
+            values[OVERSHOOT] = max(0, (self._peak - 1) * 100)
+        if self._settled_count:
+            values[SETTLING] = self._last_out
+            values[SS_ERROR] = self._settled_sum / self._settled_count
+        else:
+            values[SETTLING] = _NAN
+            values[SS_ERROR] = self._prev_error
+        if not self._step:
+            values[RISE] = _NAN
+            values[OVERSHOOT] = _NAN
+            values[SETTLING] = _NAN
+        values[IAE] = self._iae
+        values[ISE] = self._ise
+        # Two crossings are half an oscillation apart
+        if self._crossings > 1:
+            values[FREQUENCY] = (self._crossings - 1) * 500 \
+                / (self._last_cross - self._first_cross)
+        else:
+            values[FREQUENCY] = 0
+
+        self.results.clear()
+        for value in values:
+            self.results.put(value)
+        return values
+
+    def report(self):
+        """!@brief      Creates a printout of the metrics from the last @c finish().
+            @return     A string with one metric on each line.
+        """
+        names = ('Rise time (ms)', 'Overshoot (%)', 'Settling time (ms)',
+                 'Steady-state error', 'IAE', 'ISE', 'Oscillation (Hz)')
+        return '\n'.join('{:<20s}{:12.3f}'.format(name, value)
+                         for name, value in zip(names, self.values))
@@ -0,0 +1,176 @@
+"""!@file supervisor.py
+@brief      Stops the motors if a task or the scheduler stops running.
+@details    Contains the "Supervisor" class, which watches the tasks in a task
+            list and the scheduler loop from a hardware timer interrupt. Each
+            timed task's @c beats count is its heartbeat; if it hasn't changed
+            for a set number of the task's periods, the task is taken to have
+            hung or been starved. The scheduler loop calls @c kick() on every
+            pass; if it hasn't done so for a set time, the loop is taken to
+            have stalled. Either way every motor registered with the
+            supervisor is disabled from within the interrupt, so the motors
+            stop within one interrupt period of the limit being passed, even
+            if no task ever runs again, and the fault is recorded.
+
+            The interrupt only reads the time and compares a few integers for
+            each task, and all its memory is allocated when the supervisor is
+            made, so it can be left running in a finished program.
+
+            Example:
+            @code
+            supervisor = Supervisor(cotask.task_list)
+            supervisor.watch(my_motor)
+            supervisor.start()
+            while not supervisor.faulted:
+                cotask.task_list.pri_sched()
+                supervisor.kick()
+            print(supervisor.report())
+            @endcode
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import array, micropython, pyb, utime
+
+## No fault has happened.
+NONE = 0
+## A task's heartbeat stopped.
+MISSED = 1
+## The scheduler loop stopped calling @c kick().
+STALL = 2
+
+
+class Supervisor:
+    """!@brief      Watches task heartbeats and the scheduler loop from a timer.
+    """
+
+    def __init__(self, task_list, timer=7, freq=100, misses=3, stall=100):
+        """!@brief              Initializes a supervisor for a task list.
+            @details            The task list should be complete, since only
+                                the timed tasks in it when the supervisor is
+                                made are watched.
+            @param task_list    The task list whose tasks are watched.
+            @param timer        The number of the hardware timer used.
+            @param freq         How many times a second the checks are made.
+            @param misses       The number of a task's periods without a run
+                                after which it has missed its releases. A
+                                task which skips a release after overrunning
+                                its budget goes two periods without a run, so
+                                this should be at least 3.
+            @param stall        The time in milliseconds without a call to
+                                @c kick() after which the loop has stalled.
+        """
+        ## The motors disabled when a fault happens.
+        self.motors = []
+        ## True while the checks are running.
+        self.running = False
+        ## True once a fault has happened.
+        self.faulted = False
+        ## The kind of fault: @c NONE, @c MISSED or @c STALL.
+        self.fault_kind = NONE
+        ## The index in @c tasks of the task which missed its releases, or -1.
+        self.fault_task = -1
+        ## The @c utime.ticks_us() time at which the fault was found.
+        self.fault_time = 0
+        ## How long, in microseconds, the heartbeat or loop had been silent.
+        self.fault_silence = 0
+
+        ## The timed tasks being watched.
+        self.tasks = tuple(task for task in task_list.tasks
+                           if task.period is not None)
+        count = len(self.tasks)
+        # The number of periods each task may go without running, which is
+        # multiplied by the task's period when it's checked so a change of
+        # period is followed; the last beat count seen for each task and when
+        # it was seen, in microseconds
+        self._misses = misses
+        self._beats = array.array('l', [0] * count)
+        self._seen = array.array('l', [0] * count)
+        self._stall = int(stall * 1000)
+        self._kicked = 0
+        self._timer = pyb.Timer(timer, freq=freq)
+
+    def watch(self, motor):
+        """!@brief          Adds a motor to be disabled if a fault happens.
+            @param motor    A @c MotorDriver, or anything with a @c disable()
+                            method.
+        """
+        self.motors.append(motor)
+
+    def start(self):
+        """!@brief          Starts the checks, counting from now.
+        """
+        micropython.alloc_emergency_exception_buf(100)
+        now = utime.ticks_us()
+        for idx in range(len(self.tasks)):
+            self._beats[idx] = self.tasks[idx].beats
+            self._seen[idx] = now
+        self._kicked = now
+        self.running = True
+        self._timer.callback(self._check)
+
+    def stop(self):
+        """!@brief          Stops the checks.
+        """
+        self._timer.callback(None)
+        self.running = False
+
+    def kick(self):
+        """!@brief          Tells the supervisor that the scheduler loop is running.
+            @details        Call this once on every pass of the scheduler loop.
+        """
+        self._kicked = utime.ticks_us()
+
+    def _check(self, timer):
+        """!@brief          Checks the heartbeats and the loop; runs in an interrupt.
+            @param timer    The timer which caused the interrupt.
+        """
+        if self.faulted:
+            return
+        now = utime.ticks_us()
+        silence = utime.ticks_diff(now, self._kicked)
+        if silence > self._stall:
+            self._trip(STALL, -1, now, silence)
+            return
+        for idx in range(len(self.tasks)):
+            beats = self.tasks[idx].beats
+            if beats != self._beats[idx]:
+                self._beats[idx] = beats
+                self._seen[idx] = now
+            else:
+                silence = utime.ticks_diff(now, self._seen[idx])
+                period = self.tasks[idx].period
+                if period is not None and silence > period * self._misses:
+                    self._trip(MISSED, idx, now, silence)
+                    return
+
+    def _trip(self, kind, task, now, silence):
+        """!@brief          Disables the motors and records a fault.
+            @param kind     The kind of fault.
+            @param task     The index of the task at fault, or -1.
+            @param now      The time at which the fault was found.
+            @param silence  How long the heartbeat or loop had been silent.
+        """
+        for motor in self.motors:
+            motor.disable()
+        self.fault_kind = kind
+        self.fault_task = task
+        self.fault_time = now
+        self.fault_silence = silence
+        self.faulted = True
+
+    def report(self):
+        """!@brief      Describes the fault, if there was one.
+            @return     A string describing the fault.
+        """
+        if not self.faulted:
+            return 'No faults'
+        if self.fault_kind == STALL:
+            what = 'Scheduler loop stalled'
+        else:
+            what = 'Task ' + self.tasks[self.fault_task].name \
+                + ' missed its releases'
+        return '{:s}: silent for {:.1f} ms at {:d} us; {:d} motors disabled' \
+            .format(what, self.fault_silence / 1000, self.fault_time,
+                    len(self.motors))
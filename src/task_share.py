@@ -24,12 +24,15 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import array
 import gc
+import utime
 import pyb
 import micropython
 
 
 ## This is a system-wide list of all the queues and shared variables. It is
-#  used to create diagnostic printouts. 
+#  used to create diagnostic printouts. Queues and shares may be kept in
+#  other lists instead by giving them a @c registry when they are created,
+#  so that separate groups of tasks, such as simulations, don't mix. 
 share_list = []
 
 ## This dictionary allows readable printouts of queue and share data types.
@@ -41,16 +44,82 @@ type_code_strings = {'b' : "int8",   'B' : "uint8",
                      'f' : "float",  'd' : "double"}
 
 
-def show_all ():
+## The number of bins in the fill-level histogram kept by profiled queues.
+HIST_BINS = 8
+
+
+def show_all (registry = None):
     """!
     Create a string holding a diagnostic printout showing the status of
     each queue and share in the system. 
+    @param registry The list of queues and shares to show, by default the
+           system-wide @c share_list
     @return A string containing information about each queue and share
     """
-    gen = (str (item) for item in share_list)
+    gen = (str (item) for item in (share_list if registry is None
+                                   else registry))
     return '\n'.join (gen)
 
 
+def size_report (registry = None):
+    """!
+    Create a string holding a report on how big each queue needs to be.
+
+    For each queue the report shows the size, the high-water mark, how many
+    items were lost because the queue was full, how many puts had to wait
+    for room, and the smallest size which is recommended to hold what was
+    seen while the queues were in use.
+    Queues whose producers have been found to outrun their consumers are
+    marked @c unbounded, as no size would be big enough for them.
+    @param registry The list of queues and shares to report on, by default
+           the system-wide @c share_list
+    @return A string containing a line of information about each queue
+    """
+    lines = ['QUEUE         SIZE  MAX FULL  LOST  STALLS  RECOMMENDED']
+    for item in (share_list if registry is None else registry):
+        if isinstance (item, Queue):
+            rec = item.recommend_size ()
+            lines.append ('{:<12s}{:6d}{:10d}{:6d}{:8d}  {:s}'.format (
+                          item._name, item._size, item._max_full, item.lost (),
+                          item.stalls (),
+                          'unbounded' if rec is None else str (rec)))
+    return '\n'.join (lines)
+
+
+# ============================================================================
+
+class _Zeros:
+    """!
+    A sequence of zeros which is counted out rather than stored.
+
+    An array made from it knows its length in advance, so the array is
+    allocated once at full size and then filled in, and no temporary list
+    or block of bytes as big as the array is needed.
+    """
+
+    def __init__ (self, length):
+        """!
+        Create a sequence of zeros.
+        @param length The number of zeros in the sequence
+        """
+        self._length = length
+
+
+    def __len__ (self):
+        """!
+        Get the number of zeros in the sequence.
+        """
+        return (self._length)
+
+
+    def __iter__ (self):
+        """!
+        Count out the zeros one at a time.
+        """
+        for idx in range (self._length):
+            yield 0
+
+
 # ============================================================================
 
 class BaseShare:
@@ -62,7 +131,8 @@ class BaseShare:
     classes @c Queue and @c Share. 
     """
 
-    def __init__ (self, type_code, thread_protect = True, name = None):
+    def __init__ (self, type_code, thread_protect = True, name = None,
+                  registry = None):
         """!
         Create a base queue object when called by a child class initializer.
 
@@ -71,8 +141,12 @@ class BaseShare:
         self._type_code = type_code
         self._thread_protect = thread_protect
 
-        # Add this queue to the global share and queue list
-        share_list.append (self)
+        # Add this queue to the global share and queue list, or to the list
+        # given for it
+        if registry is None:
+            share_list.append (self)
+        else:
+            registry.append (self)
 
 
 # ============================================================================
@@ -105,7 +179,8 @@ class Queue (BaseShare):
     ser_num = 0
 
     def __init__ (self, type_code, size, thread_protect = False, 
-                  overwrite = False, name = None):
+                  overwrite = False, name = None, profile = False,
+                  registry = None):
         """!
         Initialize a queue object to carry and buffer data between tasks.
 
@@ -132,20 +207,25 @@ class Queue (BaseShare):
                data if the queue becomes full 
         @param name A short name for the queue, default @c QueueN where @c N
                is a serial number for the queue
+        @param profile If @c True, keep a histogram of fill levels and count
+               items put and gotten so that rates can be estimated
+        @param registry The list to which the queue is added for diagnostic
+               printouts, or @c None for the system-wide @c share_list
 
         """
         # First call the parent class initializer
-        super ().__init__ (type_code, thread_protect, name)
+        super ().__init__ (type_code, thread_protect, name, registry)
 
         self._size = size
         self._overwrite = overwrite
+        self._prof = profile
         self._name = str (name) if name != None \
             else 'Queue' + str (Queue.ser_num)
         Queue.ser_num += 1
 
         # Allocate memory in which the queue's data will be stored
         try:
-            self._buffer = array.array (type_code, range (size))
+            self._buffer = array.array (type_code, _Zeros (size))
         except MemoryError:
             self._buffer = None
             raise
@@ -153,6 +233,10 @@ class Queue (BaseShare):
             self._buffer = None
             raise
 
+        # The fill level histogram is only needed when profiling
+        self._hist = array.array ('L', _Zeros (HIST_BINS)) if profile \
+            else None
+
         # Initialize pointers to be used for reading and writing data
         self.clear ()
 
@@ -186,13 +270,24 @@ class Queue (BaseShare):
         # If we're in an ISR and the queue is full and we're not allowed to
         # overwrite data, we have to give up and exit
         if self.full ():
-            if in_ISR:
-                return
-
-            # Wait (if needed) until there's room in the buffer for the data
-            if not self._overwrite:
+            # Wait (if needed) until there's room in the buffer for the data.
+            # A put which waits loses nothing, so it's counted apart from
+            # items which are dropped or written over
+            if not in_ISR and not self._overwrite:
+                self._stalls += 1
+                self._stall_run += 1
+                if self._stall_run > self._max_stall_run:
+                    self._max_stall_run = self._stall_run
                 while self.full ():
                     pass
+            else:
+                self._lost_run += 1
+                if self._lost_run > self._max_lost_run:
+                    self._max_lost_run = self._lost_run
+                if in_ISR:
+                    self._dropped += 1
+                    return
+                self._overwrites += 1
 
         # Prevent data corruption by blocking interrupts during data transfer
         if self._thread_protect and not in_ISR:
@@ -208,6 +303,9 @@ class Queue (BaseShare):
             self._num_items = self._size
         if self._num_items > self._max_full:     # Record maximum fillage
             self._max_full = self._num_items
+        if self._prof:                           # Record fill level
+            self._puts += 1
+            self._hist[(self._num_items - 1) * HIST_BINS // self._size] += 1
 
         # Re-enable interrupts
         if self._thread_protect and not in_ISR:
@@ -253,6 +351,10 @@ class Queue (BaseShare):
         self._num_items -= 1
         if self._num_items < 0:
             self._num_items = 0
+        self._lost_run = 0
+        self._stall_run = 0
+        if self._prof:
+            self._gets += 1
 
         # Re-enable interrupts
         if self._thread_protect and not in_ISR:
@@ -309,6 +411,102 @@ class Queue (BaseShare):
         return (self._num_items)
 
 
+    def max_full (self):
+        """!
+        Check the largest number of items which have been in the queue.
+
+        This method returns the queue's high-water mark since it was created
+        or last cleared.
+        @return The largest number of items which have been in the queue
+        """
+        return (self._max_full)
+
+
+    def size (self):
+        """!
+        Check how many items the queue can hold.
+        @return The maximum number of items which the queue can hold
+        """
+        return (self._size)
+
+
+    def lost (self):
+        """!
+        Count the items which didn't fit in the queue.
+
+        This is the total of items dropped by an ISR and items written over
+        old data in an overwriting queue. Puts which waited for room lost
+        nothing and are counted by @c stalls() instead.
+        @return The number of items lost because the queue was full
+        """
+        return (self._dropped + self._overwrites)
+
+
+    def stalls (self):
+        """!
+        Count the puts which had to wait for room in the queue.
+
+        Only a queue which doesn't overwrite can stall, and only when it is
+        written from outside an ISR; the item is kept, but the task which
+        put it was blocked until another task took something out.
+        @return The number of puts which found the queue full and waited
+        """
+        return (self._stalls)
+
+
+    def histogram (self):
+        """!
+        Get the queue's fill-level histogram.
+
+        Each time an item is put into a profiled queue, the bin holding the
+        new number of items is incremented; bin @c n covers fill levels from
+        @c n/HIST_BINS to @c (n+1)/HIST_BINS of the queue's size.
+        @return An array of counts, or @c None if the queue isn't profiled
+        """
+        return (self._hist)
+
+
+    def rates (self):
+        """!
+        Estimate how fast items are put into and taken from the queue.
+
+        The rates are averages since the queue was created or last cleared,
+        and are only measured if the queue is profiled.
+        @return A tuple holding the producer and consumer rates in items per
+                second, or @c None if the queue isn't profiled
+        """
+        if not self._prof:
+            return None
+        secs = utime.ticks_diff (utime.ticks_ms (), self._start) / 1000.0
+        if secs <= 0:
+            return (0.0, 0.0)
+        return (self._puts / secs, self._gets / secs)
+
+
+    def recommend_size (self, stalls = True):
+        """!
+        Recommend the smallest safe size for the queue.
+
+        The recommendation is the most items seen in the queue plus the
+        longest run of puts whose items were lost, with a quarter added as a
+        margin. Unless @c stalls is @c False, the longest run of puts which
+        had to wait for room is added too, so that a blocking put wouldn't
+        have waited. If profiling shows that items are put in faster than
+        they are taken out, no size would be big enough and @c None is
+        returned.
+        @param stalls Set to @c False to size the queue only so that no
+               items are lost, allowing puts to wait
+        @return The recommended number of items, or @c None
+        """
+        rates = self.rates ()
+        if rates is not None and rates[1] > 0 and rates[0] > 1.05 * rates[1]:
+            return None
+        needed = self._max_full + self._max_lost_run
+        if stalls:
+            needed += self._max_stall_run
+        return (needed + needed // 4 + 1)
+
+
     def clear (self):
         """!
         Remove all contents from the queue.
@@ -317,6 +515,19 @@ class Queue (BaseShare):
         self._wr_idx = 0
         self._num_items = 0
         self._max_full = 0
+        self._dropped = 0
+        self._overwrites = 0
+        self._stalls = 0
+        self._lost_run = 0
+        self._max_lost_run = 0
+        self._stall_run = 0
+        self._max_stall_run = 0
+        self._puts = 0
+        self._gets = 0
+        self._start = utime.ticks_ms ()
+        if self._hist is not None:
+            for idx in range (HIST_BINS):
+                self._hist[idx] = 0
 
 
     def __repr__ (self):
@@ -359,7 +570,8 @@ class Share (BaseShare):
     ser_num = 0
 
 
-    def __init__ (self, type_code, thread_protect = True, name = None):
+    def __init__ (self, type_code, thread_protect = True, name = None,
+                  registry = None):
         """!
         Create a shared data item used to transfer data between tasks.
 
@@ -382,9 +594,11 @@ class Share (BaseShare):
         @param thread_protect True if mutual exclusion protection is used
         @param name A short name for the share, default @c ShareN where @c N
                is a serial number for the share
+        @param registry The list to which the share is added for diagnostic
+               printouts, or @c None for the system-wide @c share_list
         """
         # First call the parent class initializer
-        super ().__init__ (type_code, thread_protect, name)
+        super ().__init__ (type_code, thread_protect, name, registry)
 
         self._buffer = array.array (type_code, [0])
 
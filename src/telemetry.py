@@ -0,0 +1,132 @@
+"""!@file telemetry.py
+@brief      Streams scheduler and share statistics as compact binary snapshots.
+@details    Contains the "Telemetry" class, which packs the profiling data of
+            every task and the high-water mark of every queue into a fixed
+            size binary snapshot and writes it to a serial stream such as a
+            @c pyb.UART. No strings are formatted on the board; the snapshots
+            are decoded and turned into time series on the host by
+            @c host/telemetry_collector.py. Each snapshot is laid out as:
+            | Part    | Format          | Contents                              |
+            |:--------|:----------------|:--------------------------------------|
+            | Header  | @c HEADER_FMT   | sync bytes, sequence number, time in us, number of tasks, number of queues |
+            | Task    | @c TASK_FMT     | runs, average and maximum duration, average and maximum lateness (us), overruns |
+            | Queue   | @c QUEUE_FMT    | maximum fill, size                    |
+            | Trailer | @c CRC_FMT      | CRC-16 of everything before it        |
+
+            The CRC is CRC-16/CCITT-FALSE (polynomial 0x1021, starting from
+            0xFFFF), which the host can check with @c binascii.crc_hqx(). It
+            lets the host tell a snapshot which lost or gained bytes on the
+            way from one which just happens to contain the sync bytes.
+
+            Example:
+            @code
+            my_telemetry = Telemetry(pyb.UART(1, 115200))
+            cotask.task_list.append(cotask.Task(my_telemetry.run, name="Telem",
+                                                priority=0, period=1000))
+            @endcode
+            The telemetry task should be created after all the other tasks and
+            queues, as it only reports on those which exist when it is made.
+@author     Nathan Dodd
+@author     Lewis Kanagy
+@author     Sean Wahl
+@date       October 18, 2026
+"""
+
+import array, struct, utime
+import cotask, task_share
+
+## The two bytes which begin every snapshot so the host can find frames.
+SYNC = b'\xa5\x5a'
+## Snapshot header: sync, sequence number, time in us, task count, queue count.
+HEADER_FMT = '<2sHIBB'
+## Per-task record: runs, avg/max duration, avg/max lateness, overruns.
+TASK_FMT = '<IIIIIH'
+## Per-queue record: maximum number of items held, size of the queue.
+QUEUE_FMT = '<HH'
+## Snapshot trailer: CRC-16 of the header and records.
+CRC_FMT = '<H'
+
+
+def crc16(buf, end):
+    """!@brief          Finds the CRC-16/CCITT-FALSE of the start of a buffer.
+        @details        The bits are worked one at a time, which is slow but
+                        needs no table and allocates nothing, and snapshots
+                        are short and seldom sent.
+        @param buf      The buffer holding the bytes.
+        @param end      The number of bytes from the start of the buffer to use.
+        @return         The CRC, from 0 to 0xFFFF.
+    """
+    crc = 0xFFFF
+    for idx in range(end):
+        crc ^= buf[idx] << 8
+        for bit in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+class Telemetry:
+    """!@brief      Sends periodic binary snapshots of scheduler health.
+       @details     All the memory a snapshot needs is allocated when the object
+                    is created, so sending one only packs integers into a
+                    buffer and writes it to the stream.
+    """
+
+    def __init__(self, stream, task_list=cotask.task_list,
+                 shares=task_share.share_list):
+        """!@brief              Initializes a telemetry object.
+            @param stream       An object with a @c write() method, such as a
+                                @c pyb.UART, to which snapshots are written.
+            @param task_list    The task list whose tasks are reported.
+            @param shares       The list of shares and queues whose queues are
+                                reported.
+        """
+        ## The stream to which snapshots are written.
+        self.stream = stream
+        # The tasks and queues to report, fixed when the object is made
+        self._tasks = tuple(task_list.tasks)
+        self._queues = tuple(item for item in shares
+                             if isinstance(item, task_share.Queue))
+        # Preallocated buffers for a snapshot and for one task's statistics
+        self._buf = bytearray(struct.calcsize(HEADER_FMT)
+                              + len(self._tasks) * struct.calcsize(TASK_FMT)
+                              + len(self._queues) * struct.calcsize(QUEUE_FMT)
+                              + struct.calcsize(CRC_FMT))
+        self._stats = array.array('L', [0] * 6)
+        self._task_size = struct.calcsize(TASK_FMT)
+        self._queue_size = struct.calcsize(QUEUE_FMT)
+        ## The sequence number of the next snapshot, which lets the host
+        #  notice snapshots which were lost.
+        self.seq = 0
+
+    def send(self):
+        """!@brief      Packs one snapshot and writes it to the stream.
+        """
+        buf = self._buf
+        stats = self._stats
+        struct.pack_into(HEADER_FMT, buf, 0, SYNC, self.seq, utime.ticks_us(),
+                         len(self._tasks), len(self._queues))
+        offset = struct.calcsize(HEADER_FMT)
+        for task in self._tasks:
+            task.get_stats(stats)
+            struct.pack_into(TASK_FMT, buf, offset, stats[0], stats[1],
+                             stats[2], stats[3], stats[4], stats[5] & 0xFFFF)
+            offset += self._task_size
+        for queue in self._queues:
+            struct.pack_into(QUEUE_FMT, buf, offset, queue.max_full(),
+                             queue.size())
+            offset += self._queue_size
+        struct.pack_into(CRC_FMT, buf, offset, crc16(buf, offset))
+        self.stream.write(buf)
+        self.seq = (self.seq + 1) & 0xFFFF
+
+    def run(self):
+        """!@brief      A generator which sends one snapshot each time it is run.
+            @details    Pass this method to @c cotask.Task to send snapshots
+                        at the task's period.
+        """
+        while True:
+            self.send()
+            yield 0